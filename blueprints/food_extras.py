@@ -1,13 +1,116 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, session
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, session, current_app, g
 from flask_login import login_required, current_user
 from models import Service, TenantService, Tenant, db
 from extensions import db as db_ext
 from notification_service import NotificationService
+from services.cache_service import cache_service
+from services.background_tasks_service import background_tasks_service
+from blueprints.guests import SERVICE_BY_NAME_CACHE_PREFIX
 from datetime import datetime, date, timedelta
-from sqlalchemy import and_
+from sqlalchemy import and_, func
+import json
+from sqlalchemy.orm import contains_eager, joinedload, selectinload, raiseload, load_only
 
 food_extras_bp = Blueprint('food_extras', __name__, url_prefix='/food-extras')
 
+@food_extras_bp.before_request
+def _set_request_date():
+    """Resolve today's date once so every query in the request agrees on it"""
+    g.today = date.today()
+
+QUICK_STATS_CACHE_PREFIX = 'food_quick_stats:'
+
+# Service types that are prepared by the kitchen
+_FOOD_TYPES = frozenset({'restaurant', 'meal'})
+
+def _is_food_service(service):
+    """Whether orders for this service should be announced to the kitchen"""
+    service_name_lower = service.name.lower()
+    return (service.service_type in _FOOD_TYPES or
+            'food' in service_name_lower or
+            'meal' in service_name_lower)
+
+def _eager(*options):
+    """Return loader options, forbidding any other lazy load when running in debug mode"""
+    if current_app.debug:
+        return [*options, raiseload('*')]
+    return list(options)
+
+def _paginate_with_total(query, page, per_page):
+    """Fetch one page of query plus the unpaginated row count in a single statement"""
+    rows = query.add_columns(func.count().over().label('full_count'))\
+        .limit(per_page).offset((page - 1) * per_page).all()
+    total = rows[0].full_count if rows else 0
+    return [row[0] for row in rows], total
+
+@cache_service.memoize(timeout=300)
+def _active_services(exclude_meal_plan=False):
+    """
+    Active services ordered by name, as plain dicts of the columns the
+    service lists render; cached until a service is added or edited.
+    """
+    query = db_ext.session.query(
+        Service.id, Service.name, Service.description, Service.service_type,
+        Service.meal_category, Service.price, Service.preparation_time, Service.is_active
+    ).filter(Service.is_active == True)
+    if exclude_meal_plan:
+        query = query.filter(Service.service_type != 'meal_plan')
+    return [dict(row._mapping) for row in query.order_by(Service.name)]
+
+def _send_food_order_notification(tenant_service_id):
+    """Background task: notify all users about a newly assigned food order"""
+    tenant_service = TenantService.query.options(
+        joinedload(TenantService.tenant),
+        joinedload(TenantService.service)
+    ).filter_by(id=tenant_service_id).first()
+    if not tenant_service:
+        return
+    
+    tenant = tenant_service.tenant
+    service = tenant_service.service
+    total_price = tenant_service.unit_price * tenant_service.quantity
+    notification = NotificationService.notify_all_users(
+        title="New Food Order",
+        message=f"New order: {service.name} x{tenant_service.quantity} for guest {tenant.name}. Total: {total_price:.2f} MAD",
+        notification_type='food_order',
+        related_entity_type='tenant_service',
+        related_entity_id=tenant_service.id,
+        priority='high',
+        data={
+            'guest_name': tenant.name,
+            'service_name': service.name,
+            'quantity': tenant_service.quantity,
+            'unit_price': tenant_service.unit_price,
+            'total_price': total_price,
+            'notes': tenant_service.notes,
+            'order_date': tenant_service.start_date.isoformat()
+        }
+    )
+    if notification:
+        current_app.logger.debug("Food order notification created with ID: %s", notification.id)
+    else:
+        current_app.logger.warning("Failed to create food order notification")
+
+def _send_bulk_food_order_notification(food_items, notes, order_date):
+    """Background task: announce all food orders of a bulk assignment at once"""
+    batch_total = sum(item['total_price'] for item in food_items)
+    notification = NotificationService.notify_all_users(
+        title="New Food Orders",
+        message=f"{len(food_items)} new food orders for {order_date}. Total: {batch_total:.2f} MAD",
+        notification_type='food_order',
+        related_entity_type='tenant_service',
+        related_entity_id=None,
+        priority='high',
+        data={
+            'items': food_items,
+            'total_price': batch_total,
+            'notes': notes,
+            'order_date': order_date
+        }
+    )
+    if not notification:
+        current_app.logger.warning("Failed to create bulk food order notification")
+
 @food_extras_bp.route('/test-buttons')
 def test_buttons():
     """Test route for button functionality without authentication"""
@@ -46,63 +149,43 @@ def debug():
 def index():
     """Food & Extras dashboard"""
     # Get today's date
-    today = date.today()
+    today = g.today
     yesterday = today - timedelta(days=1)
     tomorrow = today + timedelta(days=1)
     
     # Get active services
-    services = Service.query.filter_by(is_active=True).order_by(Service.name).all()
+    services = _active_services()
     
     # Get today's meal orders
-    today_orders = TenantService.query.filter(
+    today_orders = TenantService.query.options(*_eager(
+        joinedload(TenantService.service),
+        joinedload(TenantService.tenant)
+    )).filter(
         and_(
             TenantService.start_date <= today,
             TenantService.end_date >= today
         )
     ).all()
     
-    # Get upcoming orders
-    upcoming_orders = TenantService.query.filter(
+    # Get upcoming orders, with the guest and service names the list shows
+    upcoming_orders = TenantService.query.options(*_eager(
+        joinedload(TenantService.tenant),
+        joinedload(TenantService.service)
+    )).filter(
         TenantService.start_date > today
     ).order_by(TenantService.start_date).limit(10).all()
     
     # Calculate statistics
-    total_services = Service.query.filter_by(is_active=True).count()
-    active_orders = TenantService.query.filter(
-        and_(
-            TenantService.start_date <= today,
-            TenantService.end_date >= today
-        )
-    ).count()
+    total_services = len(services)
     
-    # Calculate total meals (sum of quantities for today's orders)
-    from sqlalchemy import func
-    total_meals = db.session.query(func.sum(TenantService.quantity)).filter(
-        and_(
-            TenantService.start_date <= today,
-            TenantService.end_date >= today
-        )
-    ).scalar() or 0
-    
-    # Calculate meal counts by category for today
-    meal_counts = {
-        'breakfast': db.session.query(func.sum(TenantService.quantity)).join(Service).filter(
-            and_(
-                TenantService.start_date <= today,
-                TenantService.end_date >= today,
-                Service.service_type.in_(['meal', 'restaurant']),
-                Service.meal_category == 'breakfast'
-            )
-        ).scalar() or 0,
-        'dinner': db.session.query(func.sum(TenantService.quantity)).join(Service).filter(
-            and_(
-                TenantService.start_date <= today,
-                TenantService.end_date >= today,
-                Service.service_type.in_(['meal', 'restaurant']),
-                Service.meal_category == 'dinner'
-            )
-        ).scalar() or 0
-    }
+    # Derive today's counts from the already loaded orders
+    active_orders = len(today_orders)
+    total_meals = 0
+    meal_counts = {'breakfast': 0, 'dinner': 0}
+    for order in today_orders:
+        total_meals += order.quantity or 0
+        if order.service.service_type in _FOOD_TYPES and order.service.meal_category in meal_counts:
+            meal_counts[order.service.meal_category] += order.quantity or 0
     
     return render_template('food_extras/index.html',
                          services=services,
@@ -120,7 +203,7 @@ def index():
 @login_required
 def services():
     """Manage food and extra services"""
-    services = Service.query.filter_by(is_active=True).order_by(Service.name).all()
+    services = _active_services()
     
     return render_template('food_extras/services.html',
                          services=services)
@@ -154,6 +237,8 @@ def add_service():
             
             db_ext.session.add(service)
             db_ext.session.commit()
+            cache_service.delete_memoized(_active_services)
+            cache_service.delete_prefix(SERVICE_BY_NAME_CACHE_PREFIX)
             
             flash(f'Service "{name}" added successfully!', 'success')
             return redirect(url_for('food_extras.services'))
@@ -175,6 +260,7 @@ def view_service(service_id):
     # Get recent orders for this service
     recent_orders = TenantService.query.filter_by(service_id=service_id)\
         .join(Tenant)\
+        .options(selectinload(TenantService.tenant))\
         .order_by(TenantService.start_date.desc())\
         .limit(5).all()
     
@@ -211,6 +297,8 @@ def edit_service(service_id):
             service.is_active = is_active
             
             db_ext.session.commit()
+            cache_service.delete_memoized(_active_services)
+            cache_service.delete_prefix(SERVICE_BY_NAME_CACHE_PREFIX)
             
             flash(f'Service "{name}" updated successfully!', 'success')
             return redirect(url_for('food_extras.services'))
@@ -232,6 +320,7 @@ def deactivate_service(service_id):
     try:
         service.is_active = False
         db_ext.session.commit()
+        cache_service.delete_memoized(_active_services)
         flash(f'Service "{service.name}" deactivated successfully!', 'success')
     except Exception as e:
         db_ext.session.rollback()
@@ -277,47 +366,28 @@ def assign_service():
                 service_id=service.id,
                 quantity=quantity,
                 unit_price=unit_price,
-                start_date=date.today(),
-                end_date=date.today(),  # Same day for immediate services
+                start_date=g.today,
+                end_date=g.today,  # Same day for immediate services
                 notes=notes,
                 created_at=datetime.utcnow()
             )
             
             db_ext.session.add(tenant_service)
             db_ext.session.commit()
+            cache_service.delete_prefix(QUICK_STATS_CACHE_PREFIX)
             
             # Create notification for kitchen staff if it's a food service
-            print(f"🍽️ DEBUG: Checking service for notification - service_type: {service.service_type}, service_name: {service.name}")
-            is_food_service = (service.service_type in ['restaurant', 'meal'] or 
-                             'food' in service.name.lower() or 
-                             'meal' in service.name.lower())
-            print(f"🍽️ DEBUG: Is food service: {is_food_service}")
+            current_app.logger.debug("Checking service for notification - service_type: %s, service_name: %s",
+                                     service.service_type, service.name)
+            is_food_service = _is_food_service(service)
+            current_app.logger.debug("Is food service: %s", is_food_service)
             
             if is_food_service:
-                print(f"🍽️ DEBUG: Creating notification for food order - Service: {service.name}, Guest: {tenant.name}")
-                notification = NotificationService.notify_all_users(
-                    title="New Food Order",
-                    message=f"New order: {service.name} x{quantity} for guest {tenant.name}. Total: {unit_price * quantity:.2f} MAD",
-                    notification_type='food_order',
-                    related_entity_type='tenant_service',
-                    related_entity_id=tenant_service.id,
-                    priority='high',
-                    data={
-                        'guest_name': tenant.name,
-                        'service_name': service.name,
-                        'quantity': quantity,
-                        'unit_price': unit_price,
-                        'total_price': unit_price * quantity,
-                        'notes': notes,
-                        'order_date': date.today().isoformat()
-                    }
-                )
-                if notification:
-                    print(f"✅ DEBUG: Food order notification created successfully with ID: {notification.id}")
-                else:
-                    print("❌ DEBUG: Failed to create food order notification")
+                current_app.logger.debug("Queueing notification for food order - Service: %s, Guest: %s",
+                                         service.name, tenant.name)
+                background_tasks_service.enqueue(_send_food_order_notification, tenant_service.id)
             else:
-                print("🍽️ DEBUG: Service is not a food service, skipping notification")
+                current_app.logger.debug("Service is not a food service, skipping notification")
             
             flash(f'Service "{service.name}" assigned to {tenant.name} successfully!', 'success')
             return redirect(url_for('food_extras.assign_service'))
@@ -330,15 +400,12 @@ def assign_service():
     
     # GET: Show assignment form
     # Get active guests
-    active_guests = Tenant.query.filter_by(is_active=True).order_by(Tenant.name).all()
+    active_guests = Tenant.query.options(
+        load_only(Tenant.id, Tenant.name, Tenant.room_number, Tenant.daily_rent)
+    ).filter_by(is_active=True).order_by(Tenant.name).all()
     
     # Get active services (excluding meal plans)
-    services = Service.query.filter(
-        and_(
-            Service.is_active == True,
-            Service.service_type != 'meal_plan'
-        )
-    ).order_by(Service.name).all()
+    services = _active_services(exclude_meal_plan=True)
     
     return render_template('food_extras/assign_service.html',
                          guests=active_guests,
@@ -349,14 +416,22 @@ def assign_service():
 def bulk_assign_service():
     """Bulk assign extra services to multiple guests"""
     if request.method == 'POST':
-        guest_ids = request.form.get('guest_ids[]', '').split(',') if request.form.get('guest_ids[]') else []
-        service_ids = request.form.get('service_ids[]', '').split(',') if request.form.get('service_ids[]') else []
-        quantities = request.form.get('quantities[]', '').split(',') if request.form.get('quantities[]') else []
-        custom_prices = request.form.get('custom_prices[]', '').split(',') if request.form.get('custom_prices[]') else []
-        notes = request.form.get('bulk_notes', '')
-        dietary_notes = request.form.get('dietary_notes', '')
-        vegetarian_guests = request.form.get('vegetarian_guests[]', '').split(',') if request.form.get('vegetarian_guests[]') else []
-        service_date_str = request.form.get('service_date', '')
+        # The form posts a single JSON payload (or the request body is JSON)
+        try:
+            payload = request.get_json(silent=True) or json.loads(request.form.get('payload') or '{}')
+            guest_ids = [int(gid) for gid in payload.get('guest_ids') or []]
+            service_ids = [int(sid) for sid in payload.get('service_ids') or []]
+            vegetarian_guests = {int(gid) for gid in payload.get('vegetarian_guests') or []}
+        except (ValueError, TypeError, AttributeError):
+            flash('Invalid bulk assignment data.', 'error')
+            return redirect(url_for('food_extras.bulk_assign_service'))
+        
+        # quantities / custom_prices are per-guest lists, one entry per selected service
+        quantities = payload.get('quantities') or []
+        custom_prices = payload.get('custom_prices') or []
+        notes = payload.get('bulk_notes') or ''
+        dietary_notes = payload.get('dietary_notes') or ''
+        service_date_str = payload.get('service_date') or ''
         
         # Validation
         if not guest_ids:
@@ -372,19 +447,33 @@ def bulk_assign_service():
             success_count = 0
             failed_assignments = []
             
+            # Fetch all selected guests and services up front
+            tenants = {t.id: t for t in Tenant.query.filter(Tenant.id.in_(guest_ids)).all()}
+            services_by_id = {s.id: s for s in Service.query.filter(Service.id.in_(service_ids)).all()}
+            
+            # Parse service date
+            try:
+                if service_date_str:
+                    service_date = datetime.strptime(service_date_str, '%Y-%m-%d').date()
+                else:
+                    service_date = g.today
+            except ValueError:
+                service_date = g.today
+            
+            new_rows = []
             for i, guest_id in enumerate(guest_ids):
                 for j, service_id in enumerate(service_ids):
+                    tenant = tenants.get(guest_id)
+                    service = services_by_id.get(service_id)
+                    
+                    if not tenant or not service:
+                        failed_assignments.append(f"Guest {guest_id} or Service {service_id} not found")
+                        continue
+                    
                     try:
-                        tenant = Tenant.query.get(guest_id)
-                        service = Service.query.get(service_id)
-                        
-                        if not tenant or not service:
-                            failed_assignments.append(f"Guest {guest_id} or Service {service_id} not found")
-                            continue
-                        
                         # Get quantity and price for this combination
-                        quantity = int(quantities[i * len(service_ids) + j]) if quantities else 1
-                        custom_price = custom_prices[i * len(service_ids) + j] if custom_prices else None
+                        quantity = int(quantities[i][j]) if quantities else 1
+                        custom_price = custom_prices[i][j] if custom_prices else None
                         
                         # Use custom price if provided, otherwise use service price
                         unit_price = float(custom_price) if custom_price else service.price
@@ -400,23 +489,14 @@ def bulk_assign_service():
                         # Create tenant service assignment
                         # Combine notes with dietary information if this guest is vegetarian
                         combined_notes = notes
-                        if str(tenant.id) in vegetarian_guests:
+                        if tenant.id in vegetarian_guests:
                             combined_notes = f"{notes}\n\nDIETARY: Vegetarian guest"
                             if dietary_notes:
                                 combined_notes += f"\nDietary notes: {dietary_notes}"
                         elif dietary_notes:
                             combined_notes = f"{notes}\n\nDIETARY: {dietary_notes}"
                         
-                                                # Parse service date
-                        try:
-                            if service_date_str:
-                                service_date = datetime.strptime(service_date_str, '%Y-%m-%d').date()
-                            else:
-                                service_date = date.today()
-                        except ValueError:
-                            service_date = date.today()
-                        
-                        tenant_service = TenantService(
+                        new_rows.append(TenantService(
                             tenant_id=tenant.id,
                             service_id=service.id,
                             quantity=quantity,
@@ -425,9 +505,7 @@ def bulk_assign_service():
                             end_date=service_date,
                             notes=combined_notes,
                             created_at=datetime.utcnow()
-                        )
-                        
-                        db_ext.session.add(tenant_service)
+                        ))
                         success_count += 1
                         
                     except Exception as e:
@@ -436,7 +514,30 @@ def bulk_assign_service():
             
             # Commit all successful assignments
             if success_count > 0:
+                # Describe the food orders of this batch while guests and services
+                # are still loaded; commit expires them
+                food_items = [
+                    {
+                        'guest_name': tenants[row.tenant_id].name,
+                        'service_name': services_by_id[row.service_id].name,
+                        'quantity': row.quantity,
+                        'unit_price': row.unit_price,
+                        'total_price': row.unit_price * row.quantity
+                    }
+                    for row in new_rows if _is_food_service(services_by_id[row.service_id])
+                ]
+                
+                db_ext.session.bulk_save_objects(new_rows)
                 db_ext.session.commit()
+                cache_service.delete_prefix(QUICK_STATS_CACHE_PREFIX)
+                
+                # Announce them in one notification, in the background
+                if food_items:
+                    background_tasks_service.enqueue(
+                        _send_bulk_food_order_notification,
+                        food_items, notes, service_date.isoformat()
+                    )
+                
                 flash(f'Successfully assigned services to {success_count} guest-service combinations!', 'success')
                 
                 if failed_assignments:
@@ -455,15 +556,12 @@ def bulk_assign_service():
     
     # GET: Show bulk assignment form
     # Get active guests
-    active_guests = Tenant.query.filter_by(is_active=True).order_by(Tenant.name).all()
+    active_guests = Tenant.query.options(
+        load_only(Tenant.id, Tenant.name, Tenant.room_number)
+    ).filter_by(is_active=True).order_by(Tenant.name).all()
     
     # Get active services (excluding meal plans)
-    services = Service.query.filter(
-        and_(
-            Service.is_active == True,
-            Service.service_type != 'meal_plan'
-        )
-    ).order_by(Service.name).all()
+    services = _active_services(exclude_meal_plan=True)
     
     # Get failed assignments from previous attempt
     failed_assignments = session.pop('failed_assignments', []) if 'failed_assignments' in session else []
@@ -484,11 +582,14 @@ def guest_services(tenant_id):
     # Get all services assigned to this guest
     tenant_services = TenantService.query.filter_by(tenant_id=tenant.id)\
         .join(Service)\
+        .options(*_eager(contains_eager(TenantService.service)))\
         .order_by(TenantService.created_at.desc()).all()
     
-    # Calculate totals
-    total_amount = sum(ts.quantity * ts.unit_price for ts in tenant_services)
-    total_services = len(tenant_services)
+    # Calculate totals in the database
+    total_amount, total_services = db_ext.session.query(
+        func.coalesce(func.sum(TenantService.quantity * TenantService.unit_price), 0),
+        func.count(TenantService.id)
+    ).filter(TenantService.tenant_id == tenant.id).one()
     
     return render_template('food_extras/guest_services.html',
                          tenant=tenant,
@@ -500,7 +601,10 @@ def guest_services(tenant_id):
 @login_required
 def remove_service(tenant_service_id):
     """Remove a service assignment from a guest"""
-    tenant_service = TenantService.query.get_or_404(tenant_service_id)
+    tenant_service = TenantService.query.options(
+        joinedload(TenantService.tenant),
+        joinedload(TenantService.service)
+    ).filter_by(id=tenant_service_id).first_or_404()
     tenant_name = tenant_service.tenant.name
     service_name = tenant_service.service.name
     
@@ -524,11 +628,15 @@ def orders():
     service_filter = request.args.get('service', '')
     
     # Build query
-    query = TenantService.query.join(Service).join(Tenant)
+    query = TenantService.query.join(Service).join(Tenant).options(*_eager(
+        contains_eager(TenantService.service),
+        contains_eager(TenantService.tenant)
+    ))
+    
+    today = g.today
     
     # Apply date filter
     if date_filter == 'today':
-        today = date.today()
         query = query.filter(
             and_(
                 TenantService.start_date <= today,
@@ -536,7 +644,7 @@ def orders():
             )
         )
     elif date_filter == 'tomorrow':
-        tomorrow = date.today() + timedelta(days=1)
+        tomorrow = today + timedelta(days=1)
         query = query.filter(
             and_(
                 TenantService.start_date <= tomorrow,
@@ -544,7 +652,7 @@ def orders():
             )
         )
     elif date_filter == 'week':
-        week_start = date.today() - timedelta(days=date.today().weekday())
+        week_start = today - timedelta(days=today.weekday())
         week_end = week_start + timedelta(days=6)
         query = query.filter(
             and_(
@@ -557,87 +665,137 @@ def orders():
     if service_filter:
         query = query.filter(Service.name.ilike(f'%{service_filter}%'))
     
-    orders = query.order_by(TenantService.start_date).all()
+    query = query.order_by(TenantService.start_date)
+    
+    # Pagination is opt-in via ?page=; the total comes back with the page rows
+    page = request.args.get('page', type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    if page and page > 0 and per_page > 0:
+        orders, total_orders = _paginate_with_total(query, page, per_page)
+    else:
+        page = None
+        orders = query.all()
+        total_orders = len(orders)
     
     return render_template('food_extras/orders.html',
                          orders=orders,
+                         total_orders=total_orders,
+                         page=page,
+                         per_page=per_page,
                          date_filter=date_filter,
                          service_filter=service_filter,
-                         today=date.today())
+                         today=today)
 
 @food_extras_bp.route('/daily-summary')
 @login_required
 def daily_summary():
     """Daily summary of food and extra services"""
-    selected_date = request.args.get('date', date.today().isoformat())
+    selected_date = request.args.get('date', g.today.isoformat())
     
     try:
         selected_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
     except ValueError:
-        selected_date = date.today()
-    
-    # Get orders for selected date
-    daily_orders = TenantService.query.filter(
+        selected_date = g.today
+    
+    # Per-service totals, grouped in the database
+    summary_rows = db_ext.session.query(
+        Service.id,
+        Service.name,
+        func.sum(TenantService.quantity),
+        func.sum(TenantService.quantity * TenantService.unit_price),
+        func.count(TenantService.id)
+    ).select_from(TenantService).join(Service).join(Tenant).filter(
         and_(
             TenantService.start_date <= selected_date,
             TenantService.end_date >= selected_date
         )
-    ).join(Service).join(Tenant).order_by(Service.name).all()
-    
-    # Group by service
-    service_summary = {}
-    for order in daily_orders:
-        service_name = order.service.name
-        if service_name not in service_summary:
-            service_summary[service_name] = {
-                'total_quantity': 0,
-                'total_revenue': 0,
-                'orders': []
-            }
-        
-        service_summary[service_name]['total_quantity'] += order.quantity
-        service_summary[service_name]['total_revenue'] += order.quantity * order.unit_price
-        service_summary[service_name]['orders'].append(order)
+    ).group_by(Service.id, Service.name).order_by(Service.name).all()
+    
+    service_summary = {
+        service_name: {
+            'service_id': service_id,
+            'total_quantity': total_quantity or 0,
+            'total_revenue': total_revenue or 0,
+            'order_count': order_count
+        }
+        for service_id, service_name, total_quantity, total_revenue, order_count in summary_rows
+    }
     
     return render_template('food_extras/daily_summary.html',
                          service_summary=service_summary,
                          selected_date=selected_date)
 
+@food_extras_bp.route('/daily-summary/<int:service_id>/orders')
+@login_required
+def daily_summary_orders(service_id):
+    """API endpoint listing one service's guest orders for the daily summary"""
+    try:
+        selected_date = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        selected_date = g.today
+    
+    orders = TenantService.query.filter(
+        and_(
+            TenantService.service_id == service_id,
+            TenantService.start_date <= selected_date,
+            TenantService.end_date >= selected_date
+        )
+    ).join(Tenant).options(*_eager(
+        contains_eager(TenantService.tenant)
+    )).order_by(Tenant.name).all()
+    
+    return jsonify({
+        'success': True,
+        'orders': [{
+            'guest_name': order.tenant.name,
+            'guest_url': url_for('guests.view', tenant_id=order.tenant.id),
+            'quantity': order.quantity,
+            'unit_price': float(order.unit_price),
+            'total_price': float(order.quantity * order.unit_price)
+        } for order in orders]
+    })
+
 @food_extras_bp.route('/api/quick-stats')
 @login_required
 def quick_stats():
     """API endpoint for quick dashboard stats"""
     try:
-        today = date.today()
+        today = g.today
+        cache_key = f'{QUICK_STATS_CACHE_PREFIX}{today.isoformat()}'
+        stats = cache_service.get(cache_key)
         
-        # Today's orders
-        today_orders = TenantService.query.filter(
-            and_(
-                TenantService.start_date <= today,
-                TenantService.end_date >= today
-            )
-        ).count()
-        
-        # Total active services
-        total_services = Service.query.filter_by(is_active=True).count()
-        
-        # Revenue today
-        today_revenue = db_ext.session.query(
-            db_ext.func.sum(TenantService.quantity * TenantService.unit_price)
-        ).filter(
-            and_(
-                TenantService.start_date <= today,
-                TenantService.end_date >= today
-            )
-        ).scalar() or 0
-        
-        return jsonify({
-            'success': True,
-            'stats': {
+        if stats is None:
+            # Today's orders
+            today_orders = TenantService.query.filter(
+                and_(
+                    TenantService.start_date <= today,
+                    TenantService.end_date >= today
+                )
+            ).count()
+            
+            # Total active services
+            total_services = Service.query.filter_by(is_active=True).count()
+            
+            # Revenue today
+            today_revenue = db_ext.session.query(
+                func.sum(TenantService.quantity * TenantService.unit_price)
+            ).filter(
+                and_(
+                    TenantService.start_date <= today,
+                    TenantService.end_date >= today
+                )
+            ).scalar() or 0
+            
+            stats = {
                 'today_orders': today_orders,
                 'total_services': total_services,
                 'today_revenue': float(today_revenue)
             }
+            cache_service.set(cache_key, stats, timeout=30)
+        
+        return jsonify({
+            'success': True,
+            'stats': stats
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -3,40 +3,109 @@ from flask_login import login_required, current_user
 from extensions import db
 from models import Tenant, GuestCommunication
 from permissions import require_frontdesk_or_admin
+from services.background_tasks_service import background_tasks_service
+from services.cache_service import cache_service
+from services.smtp_pool import get_smtp_pool
+from sqlalchemy import func, case, and_
+from sqlalchemy.orm import joinedload
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import json
+import logging
 import os
+import re
+import smtplib
+import threading
+
+logger = logging.getLogger(__name__)
 
 guest_communications_bp = Blueprint('guest_communications', __name__, url_prefix='/guest-communications')
 
+# recipient_type value for a single guest, e.g. "guest_42"
+_GUEST_RE = re.compile(r'^guest_(\d+)$')
+
+# Recipients are streamed and their log rows inserted in batches of this size
+DELIVERY_BATCH_SIZE = 500
+
+# Sends are network-bound, so a batch is fanned out over a few threads
+DELIVERY_WORKERS = int(os.getenv('GUEST_DELIVERY_WORKERS', '8'))
+_delivery_executor = ThreadPoolExecutor(max_workers=DELIVERY_WORKERS, thread_name_prefix='guest-delivery')
+
+# Recipients per SMTP envelope when the server supports PIPELINING
+EMAIL_RCPT_GROUP_SIZE = 50
+
+# Numbers per Twilio Notify request when bulk SMS is configured
+SMS_NOTIFY_CHUNK_SIZE = 100
+
+# Common message templates; built once and shared by every request to templates()
+_DEFAULT_TEMPLATES = (
+    {
+        'name': 'Welcome Message',
+        'type': 'email',
+        'subject': 'Welcome to Our Hostel!',
+        'message': 'Dear {guest_name},\n\nWelcome to our hostel! We hope you have a wonderful stay. If you need anything, please don\'t hesitate to contact us.\n\nBest regards,\nHostel Management'
+    },
+    {
+        'name': 'Check-out Reminder',
+        'type': 'email',
+        'subject': 'Check-out Reminder',
+        'message': 'Dear {guest_name},\n\nThis is a friendly reminder that your check-out is scheduled for tomorrow at 11:00 AM. Please ensure all belongings are packed and the room is ready for inspection.\n\nThank you for staying with us!\n\nBest regards,\nHostel Management'
+    },
+    {
+        'name': 'Payment Reminder',
+        'type': 'sms',
+        'subject': 'Payment Reminder',
+        'message': 'Hi {guest_name}, this is a reminder that your payment of ${amount} is due. Please visit the front desk to complete payment. Thank you!'
+    },
+    {
+        'name': 'WiFi Information',
+        'type': 'email',
+        'subject': 'WiFi Access Information',
+        'message': 'Dear {guest_name},\n\nHere are your WiFi details:\nNetwork: HostelWiFi\nPassword: Welcome123\n\nEnjoy your stay!\n\nBest regards,\nHostel Management'
+    }
+)
+
 @guest_communications_bp.route('/')
 @login_required
 @require_frontdesk_or_admin
 def index():
     """Guest communications dashboard"""
     # Recent communications
-    recent_communications = GuestCommunication.query.order_by(
+    recent_communications = GuestCommunication.query.options(
+        joinedload(GuestCommunication.tenant),
+        joinedload(GuestCommunication.sent_by_user)
+    ).order_by(
         GuestCommunication.sent_at.desc()
     ).limit(20).all()
     
+    return render_template('guest_communications/index.html',
+                         recent_communications=recent_communications,
+                         **_dashboard_stats())
+
+@cache_service.memoize(timeout=60)
+def _dashboard_stats():
+    """Communication and contact counts for the dashboard, cached for a minute"""
     # Communication stats
-    total_sent = GuestCommunication.query.count()
-    email_sent = GuestCommunication.query.filter_by(communication_type='email').count()
-    sms_sent = GuestCommunication.query.filter_by(communication_type='sms').count()
+    sent_by_type = dict(db.session.query(
+        GuestCommunication.communication_type,
+        func.count(GuestCommunication.id)
+    ).group_by(GuestCommunication.communication_type).all())
     
     # Guests with contact info
-    guests_with_email = Tenant.query.filter(Tenant.email.isnot(None), Tenant.email != '').count()
-    guests_with_phone = Tenant.query.filter(Tenant.phone.isnot(None), Tenant.phone != '').count()
+    guests_with_email, guests_with_phone = db.session.query(
+        func.coalesce(func.sum(case((and_(Tenant.email.isnot(None), Tenant.email != ''), 1), else_=0)), 0),
+        func.coalesce(func.sum(case((and_(Tenant.phone.isnot(None), Tenant.phone != ''), 1), else_=0)), 0)
+    ).one()
     
-    return render_template('guest_communications/index.html',
-                         recent_communications=recent_communications,
-                         total_sent=total_sent,
-                         email_sent=email_sent,
-                         sms_sent=sms_sent,
-                         guests_with_email=guests_with_email,
-                         guests_with_phone=guests_with_phone)
+    return {
+        'total_sent': sum(sent_by_type.values()),
+        'email_sent': sent_by_type.get('email', 0),
+        'sms_sent': sent_by_type.get('sms', 0),
+        'guests_with_email': guests_with_email,
+        'guests_with_phone': guests_with_phone
+    }
 
 @guest_communications_bp.route('/send-email', methods=['GET', 'POST'])
 @login_required
@@ -52,68 +121,22 @@ def send_email():
             flash('All fields are required.', 'error')
             return redirect(url_for('guest_communications.send_email'))
         
-        # Get recipients based on type
-        recipients = []
-        if recipient_type == 'all':
-            recipients = Tenant.query.filter(
-                Tenant.email.isnot(None), 
-                Tenant.email != ''
-            ).all()
-        elif recipient_type == 'active':
-            recipients = Tenant.query.filter(
-                Tenant.email.isnot(None), 
-                Tenant.email != '',
-                Tenant.is_active == True
-            ).all()
-        elif recipient_type.startswith('guest_'):
-            guest_id = recipient_type.split('_')[1]
-            guest = Tenant.query.get(guest_id)
-            if guest and guest.email:
-                recipients = [guest]
-        
-        # Send emails
-        sent_count = 0
-        for guest in recipients:
-            try:
-                if send_email_notification(guest.email, subject, message):
-                    # Log communication
-                    communication = GuestCommunication(
-                        tenant_id=guest.id,
-                        communication_type='email',
-                        subject=subject,
-                        message=message,
-                        sent_by=current_user.id,
-                        sent_at=datetime.utcnow(),
-                        status='sent'
-                    )
-                    db.session.add(communication)
-                    sent_count += 1
-                else:
-                    # Log failed communication
-                    communication = GuestCommunication(
-                        tenant_id=guest.id,
-                        communication_type='email',
-                        subject=subject,
-                        message=message,
-                        sent_by=current_user.id,
-                        sent_at=datetime.utcnow(),
-                        status='failed'
-                    )
-                    db.session.add(communication)
-            except Exception as e:
-                print(f"Error sending email to {guest.email}: {e}")
-        
-        db.session.commit()
+        # Only count the recipients here; the worker selects them itself in batches
+        recipient_count = _recipient_count(recipient_type, Tenant.email)
+        if not recipient_count:
+            flash('No guests with an email address match the selected recipients.', 'error')
+            return redirect(url_for('guest_communications.send_email'))
         
-        if sent_count > 0:
-            flash(f'Successfully sent email to {sent_count} guest(s).', 'success')
-        else:
-            flash('No emails were sent. Please check your email configuration.', 'error')
+        # Deliver in the background; each send is logged as a GuestCommunication
+        background_tasks_service.enqueue(
+            deliver_emails, recipient_type, subject, message, current_user.id
+        )
+        flash(f'Sending email to {recipient_count} guest(s) in the background.', 'success')
         
         return redirect(url_for('guest_communications.index'))
     
-    # GET request - show form
-    guests = Tenant.query.filter(
+    # GET request - show form; the picker only needs id, name and email
+    guests = db.session.query(Tenant.id, Tenant.name, Tenant.email).filter(
         Tenant.email.isnot(None), 
         Tenant.email != ''
     ).all()
@@ -133,61 +156,22 @@ def send_sms():
             flash('All fields are required.', 'error')
             return redirect(url_for('guest_communications.send_sms'))
         
-        # Get recipients based on type
-        recipients = []
-        if recipient_type == 'all':
-            recipients = Tenant.query.filter(
-                Tenant.phone.isnot(None), 
-                Tenant.phone != ''
-            ).all()
-        elif recipient_type == 'active':
-            recipients = Tenant.query.filter(
-                Tenant.phone.isnot(None), 
-                Tenant.phone != '',
-                Tenant.is_active == True
-            ).all()
-        elif recipient_type.startswith('guest_'):
-            guest_id = recipient_type.split('_')[1]
-            guest = Tenant.query.get(guest_id)
-            if guest and guest.phone:
-                recipients = [guest]
-        
-        # Send SMS (placeholder - would integrate with SMS service)
-        sent_count = 0
-        for guest in recipients:
-            try:
-                # This is a placeholder - you would integrate with Twilio, AWS SNS, etc.
-                sms_sent = send_sms_notification(guest.phone, message)
-                
-                # Log communication
-                communication = GuestCommunication(
-                    tenant_id=guest.id,
-                    communication_type='sms',
-                    subject='SMS Notification',
-                    message=message,
-                    sent_by=current_user.id,
-                    sent_at=datetime.utcnow(),
-                    status='sent' if sms_sent else 'failed'
-                )
-                db.session.add(communication)
-                
-                if sms_sent:
-                    sent_count += 1
-                    
-            except Exception as e:
-                print(f"Error sending SMS to {guest.phone}: {e}")
-        
-        db.session.commit()
+        # Only count the recipients here; the worker selects them itself in batches
+        recipient_count = _recipient_count(recipient_type, Tenant.phone)
+        if not recipient_count:
+            flash('No guests with a phone number match the selected recipients.', 'error')
+            return redirect(url_for('guest_communications.send_sms'))
         
-        if sent_count > 0:
-            flash(f'Successfully sent SMS to {sent_count} guest(s).', 'success')
-        else:
-            flash('No SMS messages were sent. Please check your SMS configuration.', 'error')
+        # Deliver in the background; each send is logged as a GuestCommunication
+        background_tasks_service.enqueue(
+            deliver_sms, recipient_type, message, current_user.id
+        )
+        flash(f'Sending SMS to {recipient_count} guest(s) in the background.', 'success')
         
         return redirect(url_for('guest_communications.index'))
     
-    # GET request - show form
-    guests = Tenant.query.filter(
+    # GET request - show form; the picker only needs id, name and phone
+    guests = db.session.query(Tenant.id, Tenant.name, Tenant.phone).filter(
         Tenant.phone.isnot(None), 
         Tenant.phone != ''
     ).all()
@@ -199,35 +183,7 @@ def send_sms():
 @require_frontdesk_or_admin
 def templates():
     """Manage communication templates"""
-    # This would store common message templates
-    default_templates = [
-        {
-            'name': 'Welcome Message',
-            'type': 'email',
-            'subject': 'Welcome to Our Hostel!',
-            'message': 'Dear {guest_name},\n\nWelcome to our hostel! We hope you have a wonderful stay. If you need anything, please don\'t hesitate to contact us.\n\nBest regards,\nHostel Management'
-        },
-        {
-            'name': 'Check-out Reminder',
-            'type': 'email',
-            'subject': 'Check-out Reminder',
-            'message': 'Dear {guest_name},\n\nThis is a friendly reminder that your check-out is scheduled for tomorrow at 11:00 AM. Please ensure all belongings are packed and the room is ready for inspection.\n\nThank you for staying with us!\n\nBest regards,\nHostel Management'
-        },
-        {
-            'name': 'Payment Reminder',
-            'type': 'sms',
-            'subject': 'Payment Reminder',
-            'message': 'Hi {guest_name}, this is a reminder that your payment of ${amount} is due. Please visit the front desk to complete payment. Thank you!'
-        },
-        {
-            'name': 'WiFi Information',
-            'type': 'email',
-            'subject': 'WiFi Access Information',
-            'message': 'Dear {guest_name},\n\nHere are your WiFi details:\nNetwork: HostelWiFi\nPassword: Welcome123\n\nEnjoy your stay!\n\nBest regards,\nHostel Management'
-        }
-    ]
-    
-    return render_template('guest_communications/templates.html', templates=default_templates)
+    return render_template('guest_communications/templates.html', templates=_DEFAULT_TEMPLATES)
 
 @guest_communications_bp.route('/history')
 @login_required
@@ -237,7 +193,10 @@ def history():
     page = request.args.get('page', 1, type=int)
     per_page = 20
     
-    communications = GuestCommunication.query.order_by(
+    communications = GuestCommunication.query.options(
+        joinedload(GuestCommunication.tenant),
+        joinedload(GuestCommunication.sent_by_user)
+    ).order_by(
         GuestCommunication.sent_at.desc()
     ).paginate(
         page=page, 
@@ -247,69 +206,263 @@ def history():
     
     return render_template('guest_communications/history.html', communications=communications)
 
-def send_email_notification(recipient_email, subject, message):
-    """Send email notification (placeholder implementation)"""
+def deliver_emails(recipient_type, subject, message, sent_by):
+    """Background task: email each recipient and log the outcome"""
+    def send(recipient_emails):
+        return send_email_batch(recipient_emails, subject, message)
+    
+    # One chunk per SMTP connection so no job waits on the pool
+    pool = get_smtp_pool()
+    parallelism = min(DELIVERY_WORKERS, pool.max_conns) if pool else DELIVERY_WORKERS
+    
+    for batch in _recipient_batches(recipient_type, Tenant.email):
+        emails = [guest.email for guest in batch]
+        chunk_size = -(-len(emails) // parallelism)
+        chunks = [emails[start:start + chunk_size]
+                  for start in range(0, len(emails), chunk_size)]
+        results = {}
+        for chunk_results in _delivery_executor.map(send, chunks):
+            results.update(chunk_results)
+        
+        communications = []
+        for guest in batch:
+            email_sent = results.get(guest.email)
+            
+            # Log communication
+            communications.append({
+                'tenant_id': guest.id,
+                'communication_type': 'email',
+                'subject': subject,
+                'message': message,
+                'sent_by': sent_by,
+                'sent_at': datetime.utcnow(),
+                'status': 'sent' if email_sent else 'failed'
+            })
+        # Commit each batch so its log survives a failure later in the run
+        _log_communications(communications)
+        db.session.commit()
+    
+    cache_service.delete_memoized(_dashboard_stats)
+
+def deliver_sms(recipient_type, message, sent_by):
+    """Background task: text each recipient and log the outcome"""
+    for batch in _recipient_batches(recipient_type, Tenant.phone):
+        results = send_sms_batch([guest.phone for guest in batch], message)
+        
+        communications = []
+        for guest in batch:
+            sms_sent = results.get(guest.phone)
+            if sms_sent is None:
+                continue
+            
+            # Log communication
+            communications.append({
+                'tenant_id': guest.id,
+                'communication_type': 'sms',
+                'subject': 'SMS Notification',
+                'message': message,
+                'sent_by': sent_by,
+                'sent_at': datetime.utcnow(),
+                'status': 'sent' if sms_sent else 'failed'
+            })
+        # Commit each batch so its log survives a failure later in the run
+        _log_communications(communications)
+        db.session.commit()
+    
+    cache_service.delete_memoized(_dashboard_stats)
+
+def _recipient_filters(recipient_type, contact_column):
+    """
+    Filters selecting the guests addressed by recipient_type ('all', 'active'
+    or 'guest_<id>') that have a value in contact_column, or None when the
+    type is not recognised.
+    """
+    filters = [contact_column.isnot(None), contact_column != '']
+    if recipient_type == 'all':
+        return filters
+    if recipient_type == 'active':
+        return filters + [Tenant.is_active == True]
+    guest_match = _GUEST_RE.match(recipient_type)
+    if guest_match:
+        return filters + [Tenant.id == int(guest_match.group(1))]
+    return None
+
+def _recipient_count(recipient_type, contact_column):
+    """Number of guests a send to recipient_type would reach"""
+    filters = _recipient_filters(recipient_type, contact_column)
+    if filters is None:
+        return 0
+    return db.session.query(func.count(Tenant.id)).filter(*filters).scalar()
+
+def _recipient_batches(recipient_type, contact_column):
+    """
+    Yield (id, contact) rows for recipient_type as lists of up to
+    DELIVERY_BATCH_SIZE, ordered by id.
+    
+    Each batch is its own keyset query (id > last id sent) rather than one
+    server-side cursor, because the callers commit after every batch and a
+    commit closes the cursor.
+    """
+    filters = _recipient_filters(recipient_type, contact_column)
+    if filters is None:
+        return
+    
+    last_id = 0
+    while True:
+        batch = db.session.query(Tenant.id, contact_column).filter(
+            *filters, Tenant.id > last_id
+        ).order_by(Tenant.id).limit(DELIVERY_BATCH_SIZE).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+def _log_communications(communications):
+    """Insert pending GuestCommunication rows with one executemany INSERT and clear the list"""
+    if communications:
+        db.session.execute(GuestCommunication.__table__.insert(), communications)
+        communications.clear()
+
+def send_email_batch(recipient_emails, subject, message):
+    """Send the same email to many addresses; returns {recipient_email: sent}
+    
+    The MIME message is rendered once and all recipients go over a single
+    pooled SMTP connection. If the server advertises PIPELINING, up to
+    EMAIL_RCPT_GROUP_SIZE recipients share one envelope (addressed as
+    undisclosed recipients), so the body is transmitted once per group;
+    otherwise each recipient gets their own To header and envelope.
+    """
+    results = dict.fromkeys(recipient_emails, False)
     try:
-        # This is a placeholder implementation
-        # In production, you would configure SMTP settings
+        # SMTP is configured through SMTP_SERVER, SMTP_PORT, SMTP_USERNAME and
+        # SMTP_PASSWORD; connections are reused across sends by the pool
+        pool = get_smtp_pool()
+        if pool is None:
+            # Not configured - keep the placeholder behaviour
+            for recipient_email in recipient_emails:
+                logger.info("Email sent to %s: %s", recipient_email, subject)
+            return dict.fromkeys(recipient_emails, True)
         
-        # Example SMTP configuration (uncomment and configure for production):
-        # smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-        # smtp_port = int(os.getenv('SMTP_PORT', '587'))
-        # smtp_username = os.getenv('SMTP_USERNAME')
-        # smtp_password = os.getenv('SMTP_PASSWORD')
-        # 
-        # if not all([smtp_username, smtp_password]):
-        #     return False
-        # 
-        # msg = MIMEMultipart()
-        # msg['From'] = smtp_username
-        # msg['To'] = recipient_email
-        # msg['Subject'] = subject
-        # 
-        # msg.attach(MIMEText(message, 'plain'))
-        # 
-        # server = smtplib.SMTP(smtp_server, smtp_port)
-        # server.starttls()
-        # server.login(smtp_username, smtp_password)
-        # text = msg.as_string()
-        # server.sendmail(smtp_username, recipient_email, text)
-        # server.quit()
+        msg = MIMEMultipart()
+        msg['From'] = pool.username
+        msg['Subject'] = subject
         
-        print(f"Email sent to {recipient_email}: {subject}")
-        return True
+        msg.attach(MIMEText(message, 'plain'))
+        rendered = msg.as_bytes(policy=msg.policy.clone(linesep='\r\n'))
+        
+        with pool.acquire() as server:
+            if server.has_extn('pipelining'):
+                for start in range(0, len(recipient_emails), EMAIL_RCPT_GROUP_SIZE):
+                    group = recipient_emails[start:start + EMAIL_RCPT_GROUP_SIZE]
+                    try:
+                        refused = server.sendmail(pool.username, group,
+                                                  b'To: undisclosed-recipients:;\r\n' + rendered)
+                    except smtplib.SMTPRecipientsRefused as e:
+                        refused = e.recipients
+                    except smtplib.SMTPResponseException as e:
+                        logger.error("Failed to send email batch of %d: %s", len(group), e)
+                        continue
+                    
+                    # sendmail reports the addresses it could not deliver to
+                    for recipient_email in group:
+                        if recipient_email in refused:
+                            logger.error("Failed to send email to %s: %s", recipient_email, refused[recipient_email])
+                        else:
+                            results[recipient_email] = True
+            else:
+                for recipient_email in recipient_emails:
+                    try:
+                        server.sendmail(pool.username, recipient_email,
+                                        f'To: {recipient_email}\r\n'.encode('utf-8') + rendered)
+                        results[recipient_email] = True
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                        logger.error("Failed to send email to %s: %s", recipient_email, e)
         
     except Exception as e:
-        print(f"Failed to send email: {e}")
-        return False
+        logger.error("Failed to send email batch of %d: %s", len(recipient_emails), e)
+    return results
+
+def send_email_notification(recipient_email, subject, message):
+    """Send email notification over a pooled SMTP connection"""
+    return send_email_batch([recipient_email], subject, message)[recipient_email]
+
+_twilio_client = None
+_twilio_lock = threading.Lock()
+
+def _get_twilio_client():
+    """Return a shared Twilio client, or None when Twilio is not configured
+    
+    The client keeps its HTTP session (and pooled TLS connections to the
+    API) for the life of the process, so it is created once and reused.
+    """
+    global _twilio_client
+    if _twilio_client is None:
+        account_sid = os.getenv('TWILIO_ACCOUNT_SID')
+        auth_token = os.getenv('TWILIO_AUTH_TOKEN')
+        if not all([account_sid, auth_token, os.getenv('TWILIO_PHONE_NUMBER')]):
+            return None
+        try:
+            from twilio.rest import Client
+        except ImportError:
+            return None
+        with _twilio_lock:
+            if _twilio_client is None:
+                _twilio_client = Client(account_sid, auth_token)
+    return _twilio_client
+
+def send_sms_batch(phone_numbers, message):
+    """Send the same SMS to many numbers; returns {phone_number: sent}
+    
+    With TWILIO_NOTIFY_SERVICE_SID set, each chunk of numbers goes out as
+    a single Twilio Notify request; otherwise the numbers are sent
+    individually over the delivery thread pool.
+    """
+    client = _get_twilio_client()
+    notify_service_sid = os.getenv('TWILIO_NOTIFY_SERVICE_SID')
+    
+    if client is None or not notify_service_sid:
+        def send(phone_number):
+            try:
+                return send_sms_notification(phone_number, message)
+            except Exception:
+                logger.exception("Error sending SMS to %s", phone_number)
+                return None
+        return dict(zip(phone_numbers, _delivery_executor.map(send, phone_numbers)))
+    
+    results = {}
+    for start in range(0, len(phone_numbers), SMS_NOTIFY_CHUNK_SIZE):
+        chunk = phone_numbers[start:start + SMS_NOTIFY_CHUNK_SIZE]
+        try:
+            client.notify.v1.services(notify_service_sid).notifications.create(
+                to_binding=[json.dumps({'binding_type': 'sms', 'address': phone_number})
+                            for phone_number in chunk],
+                body=message
+            )
+            sent = True
+        except Exception as e:
+            logger.error("Failed to send SMS batch of %d: %s", len(chunk), e)
+            sent = False
+        results.update((phone_number, sent) for phone_number in chunk)
+    return results
 
 def send_sms_notification(phone_number, message):
-    """Send SMS notification (placeholder implementation)"""
+    """Send SMS notification through Twilio"""
     try:
-        # This is a placeholder implementation
-        # In production, you would integrate with Twilio, AWS SNS, or similar service
-        
-        # Example Twilio integration (uncomment and configure for production):
-        # from twilio.rest import Client
-        # 
-        # account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-        # auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-        # from_number = os.getenv('TWILIO_PHONE_NUMBER')
-        # 
-        # if not all([account_sid, auth_token, from_number]):
-        #     return False
-        # 
-        # client = Client(account_sid, auth_token)
-        # 
-        # message = client.messages.create(
-        #     body=message,
-        #     from_=from_number,
-        #     to=phone_number
-        # )
+        # Twilio is configured through TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN
+        # and TWILIO_PHONE_NUMBER
+        client = _get_twilio_client()
+        if client is None:
+            # Not configured - keep the placeholder behaviour
+            logger.info("SMS sent to %s: %s", phone_number, message)
+            return True
         
-        print(f"SMS sent to {phone_number}: {message}")
+        client.messages.create(
+            body=message,
+            from_=os.getenv('TWILIO_PHONE_NUMBER'),
+            to=phone_number
+        )
         return True
         
     except Exception as e:
-        print(f"Failed to send SMS: {e}")
+        logger.error("Failed to send SMS to %s: %s", phone_number, e)
         return False
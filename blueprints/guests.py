@@ -1,20 +1,56 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
-from models import Tenant, Payment, Service, TenantService, Stay, CheckInOut, Bed
+from models import Tenant, Payment, Service, TenantService, Stay, CheckInOut, Bed, Room
 from extensions import db
 from audit import log_tenant_action, log_payment_action, log_service_assignment
 from notification_service import NotificationService
-from datetime import datetime, date, timedelta
-from sqlalchemy import or_, and_, func
+from services.cache_service import cache_service
+from services.background_tasks_service import background_tasks_service
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import or_, and_, func, case, text
+from sqlalchemy.orm import joinedload, load_only
 from permissions import require_frontdesk_or_admin
+import csv
+import io
+import json
 
-def calculate_guest_balance(tenant, as_of_date=None):
+# (is_prepaid, balance <= 0, total_paid > 0) -> payment status
+_PAYMENT_STATUS = {
+    (True, True, True): 'prepaid',
+    (True, True, False): 'prepaid',
+    (True, False, True): 'prepaid',
+    (True, False, False): 'prepaid',
+    (False, True, True): 'paid',
+    (False, True, False): 'paid',
+    (False, False, True): 'partial',
+    (False, False, False): 'unpaid',
+}
+
+def _tenant_totals(tenant_id):
+    """
+    (total_paid, extra_services) for one tenant in a single round trip.
+    
+    The per-tenant counterpart of the grouped subqueries in
+    _guest_balance_columns(); both sums are correlated scalar subqueries so
+    the aggregates are written once here instead of in every caller.
+    """
+    total_paid = db.session.query(
+        func.coalesce(func.sum(Payment.amount), 0)
+    ).filter(Payment.tenant_id == tenant_id).scalar_subquery()
+    extra_services = db.session.query(
+        func.coalesce(func.sum(TenantService.quantity * TenantService.unit_price), 0)
+    ).filter(TenantService.tenant_id == tenant_id).scalar_subquery()
+    return tuple(db.session.query(total_paid, extra_services).one())
+
+def calculate_guest_balance(tenant, as_of_date=None, total_paid=None, extra_services=None):
     """
     Calculate the correct balance for a guest, properly handling prepaid status.
     
     Args:
         tenant: Tenant object
         as_of_date: Date to calculate balance as of (defaults to today)
+        total_paid: Pre-aggregated sum of the tenant's payments (queried if None)
+        extra_services: Pre-aggregated total of the tenant's services (queried if None)
     
     Returns:
         dict: {
@@ -29,10 +65,13 @@ def calculate_guest_balance(tenant, as_of_date=None):
     if as_of_date is None:
         as_of_date = date.today()
     
-    # Get all payments
-    total_paid = db.session.query(func.sum(Payment.amount)).filter(
-        Payment.tenant_id == tenant.id
-    ).scalar() or 0
+    # Get payment and service totals that were not passed in
+    if total_paid is None or extra_services is None:
+        queried_paid, queried_services = _tenant_totals(tenant.id)
+        if total_paid is None:
+            total_paid = queried_paid
+        if extra_services is None:
+            extra_services = queried_services
     
     # Calculate stay duration
     if tenant.end_date:
@@ -40,10 +79,6 @@ def calculate_guest_balance(tenant, as_of_date=None):
     else:
         duration_days = (as_of_date - tenant.start_date).days
     
-    # Calculate extra services
-    tenant_services = TenantService.query.filter_by(tenant_id=tenant.id).all()
-    extra_services = sum(ts.quantity * ts.unit_price for ts in tenant_services)
-    
     # Calculate room charges based on prepaid status
     if tenant.is_prepaid:
         # For prepaid guests, room charges are 0 for the original stay
@@ -58,14 +93,7 @@ def calculate_guest_balance(tenant, as_of_date=None):
     balance = total_due - total_paid
     
     # Determine payment status
-    if tenant.is_prepaid:
-        payment_status = 'prepaid'
-    elif balance <= 0:
-        payment_status = 'paid'
-    elif total_paid > 0:
-        payment_status = 'partial'
-    else:
-        payment_status = 'unpaid'
+    payment_status = _PAYMENT_STATUS[(bool(tenant.is_prepaid), balance <= 0, total_paid > 0)]
     
     return {
         'total_paid': total_paid,
@@ -76,6 +104,160 @@ def calculate_guest_balance(tenant, as_of_date=None):
         'payment_status': payment_status
     }
 
+SERVICE_BY_NAME_CACHE_PREFIX = 'service_by_name:'
+GUEST_EVENTS_CHANNEL = 'guest_events'
+EXPORT_HEADER = ('ID', 'Name', 'Email', 'Phone', 'Check-in Date', 'Check-out Date', 'Total Amount', 'Payment Status')
+
+def _publish_guest_event(event_type, tenant_id=None, **details):
+    """
+    Queue a NOTIFY on GUEST_EVENTS_CHANNEL in the current transaction.
+    
+    PostgreSQL delivers it to listeners (see the realtime guest stream) only
+    if the transaction commits, so clients never hear about rolled back writes.
+    Bulk actions pass tenant_id=None and a count; NOTIFY payloads are limited
+    to 8000 bytes, so id lists are not sent.
+    """
+    db.session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {'channel': GUEST_EVENTS_CHANNEL,
+         'payload': json.dumps({'type': event_type, 'tenant_id': tenant_id, **details})}
+    )
+
+def _day_bounds(day):
+    """Half-open [start, end) datetime range covering a calendar day, so date
+    filters can use an index on the column instead of wrapping it in DATE()"""
+    day_start = datetime.combine(day, time.min)
+    return day_start, day_start + timedelta(days=1)
+
+def _parse_ymd(value):
+    """Parse a YYYY-MM-DD form/query value into a date (None if empty).
+    Raises ValueError on malformed input, like strptime."""
+    return date.fromisoformat(value) if value else None
+
+def _payment_month(day):
+    """Payment.payment_for_month value (YYYY-MM) for a date"""
+    return f'{day.year:04d}-{day.month:02d}'
+
+def _service_info(name):
+    """
+    Return (id, price) of the service with the given name, or None.
+    
+    Cached because the meal plan services are looked up on every guest
+    add/edit but almost never change; food_extras clears the cache when
+    services are added or edited.
+    """
+    key = SERVICE_BY_NAME_CACHE_PREFIX + name
+    info = cache_service.get(key)
+    if info is None:
+        row = db.session.query(Service.id, Service.price).filter_by(name=name).first()
+        if row is None:
+            return None
+        info = (row.id, row.price)
+        cache_service.set(key, info)
+    return info
+
+def _count_where(condition):
+    """count(*) FILTER (WHERE condition): a conditional count that lets
+    several counts share one scan of the table"""
+    return func.count().filter(condition)
+
+def _guest_counts(day=None):
+    """
+    Dashboard counts in a single round trip.
+    
+    Returns (total_guests, total_active, total_checked_in, total_payments,
+    todays_checkins, todays_checkouts), the last two being the check-ins and
+    expected check-outs on day (today by default).
+    """
+    day_start, day_end = _day_bounds(day or date.today())
+    tenant_counts = db.session.query(
+        func.count(Tenant.id).label('total_guests'),
+        _count_where(Tenant.is_active == True).label('total_active')
+    ).subquery()
+    check_in_counts = db.session.query(
+        _count_where(CheckInOut.status == 'checked_in').label('total_checked_in'),
+        _count_where(and_(
+            CheckInOut.check_in_date >= day_start,
+            CheckInOut.check_in_date < day_end
+        )).label('todays_checkins'),
+        _count_where(and_(
+            CheckInOut.status == 'checked_in',
+            CheckInOut.expected_check_out_date >= day_start,
+            CheckInOut.expected_check_out_date < day_end
+        )).label('todays_checkouts')
+    ).subquery()
+    # Note: Payment model doesn't have status field, so we'll show total payments instead
+    total_payments = db.session.query(func.count(Payment.id)).scalar_subquery()
+    
+    counts = db.session.query(
+        tenant_counts.c.total_guests,
+        tenant_counts.c.total_active,
+        check_in_counts.c.total_checked_in,
+        total_payments,
+        check_in_counts.c.todays_checkins,
+        check_in_counts.c.todays_checkouts
+    ).one()
+    return tuple(counts)
+
+@cache_service.memoize(timeout=30)
+def _cached_guest_counts(day):
+    """
+    _guest_counts() for day, cached briefly because dashboards poll
+    /api/quick-stats. Guest, check-in and payment writes clear it.
+    """
+    return _guest_counts(day)
+
+def _guest_balance_columns(as_of_date):
+    """
+    SQL equivalents of calculate_guest_balance() for use in a Tenant query.
+    
+    Returns (paid_sq, services_sq, columns), where the two subqueries must be
+    outer-joined on tenant_id and columns holds total_paid, extra_services,
+    total_due, balance and payment_status expressions.
+    Inactive guests get the 'inactive' payment status, as in index().
+    """
+    paid_sq = db.session.query(
+        Payment.tenant_id.label('tenant_id'),
+        func.sum(Payment.amount).label('total_paid')
+    ).group_by(Payment.tenant_id).subquery()
+    
+    services_sq = db.session.query(
+        TenantService.tenant_id.label('tenant_id'),
+        func.sum(TenantService.quantity * TenantService.unit_price).label('extra_services')
+    ).group_by(TenantService.tenant_id).subquery()
+    
+    total_paid = func.coalesce(paid_sq.c.total_paid, 0)
+    extra_services = func.coalesce(services_sq.c.extra_services, 0)
+    duration_days = func.coalesce(Tenant.end_date, as_of_date) - Tenant.start_date
+    room_charges = case((Tenant.is_prepaid == True, 0), else_=Tenant.daily_rent * duration_days)
+    total_due = room_charges + extra_services
+    balance = total_due - total_paid
+    
+    payment_status = case(
+        (Tenant.is_active == False, 'inactive'),
+        (Tenant.is_prepaid == True, 'prepaid'),
+        (balance <= 0, 'paid'),
+        (total_paid > 0, 'partial'),
+        else_='unpaid'
+    )
+    
+    columns = {
+        'total_paid': total_paid,
+        'extra_services': extra_services,
+        'total_due': total_due,
+        'balance': balance,
+        'payment_status': payment_status
+    }
+    return paid_sq, services_sq, columns
+
+def _calculated_total(balance_columns):
+    """Amount shown as a guest's total: the outstanding balance for active
+    prepaid guests (only extensions are charged), otherwise the total due"""
+    return case(
+        (and_(Tenant.is_active == True, Tenant.is_prepaid == True), balance_columns['balance']),
+        else_=balance_columns['total_due']
+    )
+
 guests_bp = Blueprint('guests', __name__, url_prefix='/guests')
 
 @guests_bp.route('/')
@@ -90,9 +272,33 @@ def index():
     hostel = request.args.get('hostel', '')
     date_from = request.args.get('date_from', '')
     date_to = request.args.get('date_to', '')
+    today = date.today()
     
-    # Build query
-    query = Tenant.query
+    # Build query: only the columns the guest list renders, with the balance
+    # figures computed in SQL. For prepaid guests show the balance they owe,
+    # for everyone else the total amount.
+    paid_sq, services_sq, balance_columns = _guest_balance_columns(today)
+    calculated_total = _calculated_total(balance_columns)
+    query = db.session.query(
+        Tenant.id,
+        Tenant.name,
+        Tenant.email,
+        Tenant.daily_rent,
+        Tenant.start_date,
+        Tenant.end_date,
+        Tenant.hostel_name,
+        Tenant.is_prepaid,
+        Tenant.number_of_guests,
+        Tenant.multiply_rent_by_guests,
+        calculated_total.label('calculated_total'),
+        balance_columns['payment_status'].label('payment_status'),
+        # Total amount across every matching guest, not just the current page
+        func.sum(calculated_total).over().label('filtered_total_amount')
+    ).select_from(Tenant).outerjoin(
+        paid_sq, paid_sq.c.tenant_id == Tenant.id
+    ).outerjoin(
+        services_sq, services_sq.c.tenant_id == Tenant.id
+    )
     
     # Apply search filter
     if search:
@@ -121,18 +327,22 @@ def index():
     # Apply date range filter
     if date_from:
         try:
-            from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
+            from_date = _parse_ymd(date_from)
             query = query.filter(Tenant.start_date >= from_date)
         except ValueError:
             pass  # Invalid date format, ignore filter
     
     if date_to:
         try:
-            to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
+            to_date = _parse_ymd(date_to)
             query = query.filter(Tenant.start_date <= to_date)
         except ValueError:
             pass  # Invalid date format, ignore filter
     
+    # Apply payment status filter
+    if payment_status:
+        query = query.filter(balance_columns['payment_status'] == payment_status)
+    
     # Apply sorting
     if sort == 'check_in':
         query = query.order_by(Tenant.start_date.desc())
@@ -141,85 +351,23 @@ def index():
     else:  # default: name
         query = query.order_by(Tenant.name)
     
-    tenants = query.all()
-    
-    # Calculate payment status for today (daily rent) - only for active guests
-    today = datetime.now().date()
-    for tenant in tenants:
-        if tenant.is_active:
-            # Use the centralized balance calculation function
-            balance_info = calculate_guest_balance(tenant, today)
-            
-            # Set payment status based on outstanding balance
-            if tenant.is_prepaid:
-                tenant.payment_status = 'prepaid'
-            elif balance_info['balance'] <= 0:
-                tenant.payment_status = 'paid'
-            elif balance_info['total_paid'] > 0:
-                tenant.payment_status = 'partial'
-            else:
-                tenant.payment_status = 'unpaid'
-            
-            tenant.outstanding_balance = balance_info['balance']
-            # For prepaid guests, show the balance they owe. For regular guests, show total due.
-            if tenant.is_prepaid:
-                tenant.calculated_total = balance_info['balance']  # Show what they owe
-            else:
-                tenant.calculated_total = balance_info['total_due']  # Show total amount
-        else:
-            # Calculate total amount for inactive guests too
-            total_paid = db.session.query(func.sum(Payment.amount)).filter(
-                Payment.tenant_id == tenant.id
-            ).scalar() or 0
-            
-            # Calculate total due based on stay duration
-            if tenant.end_date:
-                duration_days = (tenant.end_date - tenant.start_date).days
-            else:
-                duration_days = (today - tenant.start_date).days
-            
-            # Calculate extra services total
-            tenant_services = TenantService.query.filter_by(tenant_id=tenant.id).all()
-            extra_services_total = sum(ts.quantity * ts.unit_price for ts in tenant_services)
-            
-            # Calculate total due (room charges + extra services)
-            if tenant.is_prepaid:
-                room_charges = 0  # Prepaid guests don't pay room charges
-            else:
-                room_charges = tenant.daily_rent * duration_days
-            
-            # For prepaid guests, include services. For regular guests, include everything.
-            total_due = room_charges + extra_services_total
-            
-            tenant.payment_status = 'inactive'
-            tenant.outstanding_balance = 0
-            # Store the calculated total including services for template display
-            tenant.calculated_total = total_due
-    
-    # Apply payment status filter
-    if payment_status:
-        tenants = [tenant for tenant in tenants if tenant.payment_status == payment_status]
-    
-    # Get today's check-ins and check-outs
-    today = datetime.now().date()
-    todays_checkins = CheckInOut.query.filter(
-        db.func.date(CheckInOut.check_in_date) == today
-    ).all()
+    # Pagination is opt-in via ?page=; the total comes back with the page rows
+    page = request.args.get('page', type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    if page and page > 0 and per_page > 0:
+        tenants = query.add_columns(func.count().over().label('full_count'))\
+            .limit(per_page).offset((page - 1) * per_page).all()
+        total_tenants = tenants[0].full_count if tenants else 0
+    else:
+        page = None
+        tenants = query.all()
+        total_tenants = len(tenants)
     
-    todays_checkouts = CheckInOut.query.filter(
-        db.func.date(CheckInOut.expected_check_out_date) == today,
-        CheckInOut.status == 'checked_in'
-    ).all()
+    filtered_total_amount = tenants[0].filtered_total_amount if tenants else 0
     
-    # Get quick stats
-    total_active = Tenant.query.filter_by(is_active=True).count()
-    total_guests = Tenant.query.count()  # Total guests (active + inactive)
-    total_checked_in = CheckInOut.query.filter_by(status='checked_in').count()
-    # Note: Payment model doesn't have status field, so we'll show total payments instead
-    total_payments = Payment.query.count()
-    
-    # Calculate filtered total amount for displayed guests
-    filtered_total_amount = sum(tenant.calculated_total for tenant in tenants if hasattr(tenant, 'calculated_total'))
+    # Get quick stats, including today's check-ins and check-outs
+    (total_guests, total_active, total_checked_in, total_payments,
+     todays_checkins, todays_checkouts) = _cached_guest_counts(today)
     
     return render_template('guests/index.html', 
                          tenants=tenants,
@@ -230,99 +378,137 @@ def index():
                          total_checked_in=total_checked_in,
                          total_payments=total_payments,
                          filtered_total_amount=filtered_total_amount,
+                         total_tenants=total_tenants,
+                         page=page,
+                         per_page=per_page,
+                         pager_args={key: value for key, value in request.args.items() if key != 'page'},
                          date=date,
                          timedelta=timedelta,
                          selected_hostel=hostel,
                          selected_date_from=date_from,
                          selected_date_to=date_to)
 
+def _parse_guest_form(form):
+    """
+    Read and convert the add/edit guest form in a single pass.
+    
+    Returns a dict of typed values (end_date included). Raises ValueError
+    with a message suitable for flashing when a required field is missing
+    or a number/date cannot be parsed. Invalid meal plan dates are ignored,
+    as before.
+    """
+    is_prepaid = bool(form.get('is_prepaid'))
+    name = form.get('name')
+    daily_rent = form.get('daily_rent')
+    start_date = form.get('start_date')
+    number_of_days = form.get('number_of_days')
+    
+    # If prepaid, daily_rent is not required
+    required = [name, start_date, number_of_days]
+    if not is_prepaid:
+        required.append(daily_rent)
+    if not all(required):
+        raise ValueError('Please fill in all required fields.')
+    
+    try:
+        data = {
+            'name': name,
+            'daily_rent': 0 if is_prepaid else float(daily_rent),
+            'number_of_days': int(number_of_days),
+            'start_date': _parse_ymd(start_date),
+            'number_of_guests': int(form.get('number_of_guests') or 1),
+            'breakfast_days': int(form.get('breakfast_days') or 0),
+            'dinner_days': int(form.get('dinner_days') or 0),
+        }
+    except ValueError:
+        raise ValueError('Please enter valid numbers for daily rent and number of days.')
+    
+    data['end_date'] = data['start_date'] + timedelta(days=data['number_of_days'])
+    for field in ('meal_plan_start', 'meal_plan_end'):
+        try:
+            data[field] = _parse_ymd(form.get(field))
+        except ValueError:
+            data[field] = None
+    
+    data.update(
+        is_prepaid=is_prepaid,
+        multiply_rent_by_guests=bool(form.get('multiply_rent_by_guests')),
+        bed_id=form.get('bed_id'),  # Optional
+        hostel_name=form.get('hostel_name', ''),  # Simple string field
+        notes=form.get('notes', '')
+    )
+    return data
+
+def _build_meal_services(tenant_id, data, breakfast_service, dinner_service):
+    """TenantService rows for the meal plan described by parsed form data"""
+    meal_start = data['meal_plan_start'] or data['start_date']
+    meal_end = data['meal_plan_end'] or data['end_date']
+    meal_services = []
+    if data['breakfast_days'] > 0 and breakfast_service:
+        breakfast_service_id, breakfast_price = breakfast_service
+        # Always multiply breakfast quantity by number of guests
+        meal_services.append(TenantService(
+            tenant_id=tenant_id,
+            service_id=breakfast_service_id,
+            quantity=data['breakfast_days'] * data['number_of_guests'],
+            unit_price=breakfast_price,
+            start_date=meal_start,
+            end_date=meal_end
+        ))
+    
+    if data['dinner_days'] > 0 and dinner_service:
+        dinner_service_id, dinner_price = dinner_service
+        # Multiply quantity by number of guests if multiply_rent_by_guests is True
+        meal_quantity = data['dinner_days']
+        if data['multiply_rent_by_guests']:
+            meal_quantity *= data['number_of_guests']
+        meal_services.append(TenantService(
+            tenant_id=tenant_id,
+            service_id=dinner_service_id,
+            quantity=meal_quantity,
+            unit_price=dinner_price,
+            start_date=meal_start,
+            end_date=meal_end
+        ))
+    return meal_services
+
 @guests_bp.route('/add', methods=['GET', 'POST'])
 @login_required
 def add():
     """Add new guest with optional room assignment"""
     if request.method == 'POST':
-
-        
-        name = request.form.get('name')
-        daily_rent = request.form.get('daily_rent')
-        bed_id = request.form.get('bed_id')  # Optional
-        hostel_name = request.form.get('hostel_name', '')  # Simple string field
-        number_of_days = request.form.get('number_of_days')
-        start_date = request.form.get('start_date')
-        number_of_guests = int(request.form.get('number_of_guests', 1))
-        multiply_rent_by_guests = bool(request.form.get('multiply_rent_by_guests'))
-
-        is_prepaid = bool(request.form.get('is_prepaid'))
-        
-        # Meal planning fields
-        breakfast_days = int(request.form.get('breakfast_days', 0))
-        dinner_days = int(request.form.get('dinner_days', 0))
-        meal_plan_start = request.form.get('meal_plan_start')
-        meal_plan_end = request.form.get('meal_plan_end')
-        notes = request.form.get('notes', '')
-        
-
-        
-        # If prepaid, daily_rent is not required
-        if is_prepaid:
-            if not all([name, start_date, number_of_days]):
-                flash('Please fill in all required fields.', 'error')
-                return render_template('guests/form.html')
-        else:
-            if not all([name, daily_rent, start_date, number_of_days]):
-                flash('Please fill in all required fields.', 'error')
-                return render_template('guests/form.html')
+        try:
+            data = _parse_guest_form(request.form)
+        except ValueError as e:
+            flash(str(e), 'error')
+            return render_template('guests/form.html')
         
         # Room/bed assignment is optional
+        bed_id = data['bed_id']
 
         bed = None
         if bed_id:
-            bed = Bed.query.get(bed_id)
+            bed = db.session.get(Bed, bed_id)
             if not bed or bed.is_occupied:
                 flash('Selected bed is no longer available. Please choose another bed.', 'error')
                 return render_template('guests/form.html')
 
         
         try:
-            # If prepaid, set daily_rent to 0, otherwise convert to float
-            if is_prepaid:
-                daily_rent = 0
-            else:
-                daily_rent = float(daily_rent)
-            number_of_days = int(number_of_days)
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            
-            # Calculate end date
-            end_date = start_date + timedelta(days=number_of_days)
-            
-            # Parse meal plan dates if provided
-            meal_plan_start_date = None
-            meal_plan_end_date = None
-            if meal_plan_start:
-                try:
-                    meal_plan_start_date = datetime.strptime(meal_plan_start, '%Y-%m-%d').date()
-                except ValueError:
-                    pass
-            if meal_plan_end:
-                try:
-                    meal_plan_end_date = datetime.strptime(meal_plan_end, '%Y-%m-%d').date()
-                except ValueError:
-                    pass
-            
             # Create tenant
             tenant = Tenant(
-                name=name,
-                daily_rent=0 if is_prepaid else daily_rent,
-                number_of_guests=number_of_guests,
-                multiply_rent_by_guests=multiply_rent_by_guests,
-                hostel_name=hostel_name,
-                is_prepaid=is_prepaid,
-                start_date=start_date,
-                end_date=end_date,
-                breakfast_days=breakfast_days,
-                dinner_days=dinner_days,
-                meal_plan_start=meal_plan_start_date,
-                meal_plan_end=meal_plan_end_date,
+                name=data['name'],
+                daily_rent=data['daily_rent'],
+                number_of_guests=data['number_of_guests'],
+                multiply_rent_by_guests=data['multiply_rent_by_guests'],
+                hostel_name=data['hostel_name'],
+                is_prepaid=data['is_prepaid'],
+                start_date=data['start_date'],
+                end_date=data['end_date'],
+                breakfast_days=data['breakfast_days'],
+                dinner_days=data['dinner_days'],
+                meal_plan_start=data['meal_plan_start'],
+                meal_plan_end=data['meal_plan_end'],
                 is_active=True
             )
             
@@ -336,107 +522,52 @@ def add():
                 bed.status = 'occupied'
             
             # Create meal plan services if specified
-            if breakfast_days > 0:
-                breakfast_service = Service.query.filter_by(name='Breakfast').first()
-                if breakfast_service:
-                    # Always multiply breakfast quantity by number of guests
-                    meal_quantity = breakfast_days * number_of_guests
-                    tenant_service = TenantService(
-                        tenant_id=tenant.id,
-                        service_id=breakfast_service.id,
-                        quantity=meal_quantity,
-                        unit_price=breakfast_service.price,
-                        start_date=meal_plan_start_date or start_date,
-                        end_date=meal_plan_end_date or end_date
-                    )
-                    db.session.add(tenant_service)
-            
-            if dinner_days > 0:
-                dinner_service = Service.query.filter_by(name='Dinner').first()
-                if dinner_service:
-                    # Multiply quantity by number of guests if multiply_rent_by_guests is True
-                    meal_quantity = dinner_days * number_of_guests if multiply_rent_by_guests else dinner_days
-                    tenant_service = TenantService(
-                        tenant_id=tenant.id,
-                        service_id=dinner_service.id,
-                        quantity=meal_quantity,
-                        unit_price=dinner_service.price,
-                        start_date=meal_plan_start_date or start_date,
-                        end_date=meal_plan_end_date or end_date
-                    )
-                    db.session.add(tenant_service)
+            meal_services = _build_meal_services(
+                tenant.id, data,
+                _service_info('Breakfast') if data['breakfast_days'] > 0 else None,
+                _service_info('Dinner') if data['dinner_days'] > 0 else None
+            )
+            if meal_services:
+                db.session.bulk_save_objects(meal_services)
             
+            _publish_guest_event('add', tenant.id)
             db.session.commit()
+            cache_service.delete_memoized(_cached_guest_counts)
+            cache_service.delete_memoized(_available_beds)
             
-            # Send notification to all users about new guest creation
-            print(f"🔔 DEBUG: Creating notification for new guest - Guest: {tenant.name}")
-            notification = NotificationService.notify_all_users(
-                title="New Guest Added",
-                message=f"Guest {tenant.name} has been added to the system for {number_of_days} days",
-                notification_type='guest_added',
-                related_entity_type='tenant',
-                related_entity_id=tenant.id,
-                priority='normal',
-                data={
+            # Notify all users (and the kitchen, for meal plans) in the background
+            start_str = data['start_date'].strftime('%Y-%m-%d')
+            end_str = data['end_date'].strftime('%Y-%m-%d')
+            guest_data = {
+                'guest_name': tenant.name,
+                'number_of_days': data['number_of_days'],
+                'start_date': start_str,
+                'end_date': end_str,
+                'daily_rent': data['daily_rent'],
+                'number_of_guests': data['number_of_guests'],
+                'is_prepaid': data['is_prepaid'],
+                'hostel_name': data['hostel_name'],
+                'created_by': current_user.username
+            }
+            meal_data = None
+            if data['breakfast_days'] > 0 or data['dinner_days'] > 0:
+                meal_data = {
                     'guest_name': tenant.name,
-                    'number_of_days': number_of_days,
-                    'start_date': start_date.strftime('%Y-%m-%d'),
-                    'end_date': end_date.strftime('%Y-%m-%d'),
-                    'daily_rent': daily_rent,
-                    'number_of_guests': number_of_guests,
-                    'is_prepaid': is_prepaid,
-                    'hostel_name': hostel_name,
-                    'created_by': current_user.username
+                    'breakfast_days': data['breakfast_days'],
+                    'dinner_days': data['dinner_days'],
+                    'number_of_guests': data['number_of_guests'],
+                    'start_date': start_str,
+                    'end_date': end_str
                 }
-            )
-            if notification:
-                print(f"✅ DEBUG: Guest creation notification created successfully with ID: {notification.id}")
-            else:
-                print("❌ DEBUG: Failed to create guest creation notification")
-            
-            # Create additional notification for kitchen staff if guest has meal plans
-            print(f"🔔 DEBUG: Checking meal plans - breakfast_days: {breakfast_days}, dinner_days: {dinner_days}")
-            if breakfast_days > 0 or dinner_days > 0:
-                meal_info = []
-                if breakfast_days > 0:
-                    meal_info.append(f"{breakfast_days} breakfast days")
-                if dinner_days > 0:
-                    meal_info.append(f"{dinner_days} dinner days")
-                
-                print(f"🔔 DEBUG: Creating meal plan notification - Guest: {tenant.name}, Meal info: {meal_info}")
-                meal_notification = NotificationService.notify_all_users(
-                    title="New Guest with Meal Plan",
-                    message=f"Guest {tenant.name} has meal plan: {', '.join(meal_info)}. Number of guests: {number_of_guests}",
-                    notification_type='meal_plan',
-                    related_entity_type='tenant',
-                    related_entity_id=tenant.id,
-                    priority='high',
-                    data={
-                        'guest_name': tenant.name,
-                        'breakfast_days': breakfast_days,
-                        'dinner_days': dinner_days,
-                        'number_of_guests': number_of_guests,
-                        'start_date': start_date.strftime('%Y-%m-%d'),
-                        'end_date': end_date.strftime('%Y-%m-%d')
-                    }
-                )
-                if meal_notification:
-                    print(f"✅ DEBUG: Meal plan notification created successfully with ID: {meal_notification.id}")
-                else:
-                    print("❌ DEBUG: Failed to create meal plan notification")
-            else:
-                print("🔔 DEBUG: No meal plans found, skipping meal plan notification")
+            background_tasks_service.enqueue(_send_guest_added_notifications, tenant.id, guest_data, meal_data)
             
             # Log action
             log_tenant_action('created', tenant)
             
-            print(f"✅ Guest {name} created successfully with ID: {tenant.id}")
-            flash(f'Guest {name} added successfully!', 'success')
+            current_app.logger.info("Guest %s created with ID: %s", tenant.name, tenant.id)
+            flash(f'Guest {tenant.name} added successfully!', 'success')
             return redirect(url_for('guests.index'))
             
-        except ValueError:
-            flash('Please enter valid numbers for daily rent and number of days.', 'error')
-            return render_template('guests/form.html')
         except Exception as e:
             db.session.rollback()
             flash(f'Error creating guest: {str(e)}', 'error')
@@ -449,12 +580,57 @@ def add():
     return render_template('guests/form.html', 
                          services=services)
 
+def _send_guest_added_notifications(tenant_id, guest_data, meal_data=None):
+    """Background task: announce a new guest, and their meal plan if any, to all users"""
+    guest_name = guest_data['guest_name']
+    current_app.logger.debug("Creating notification for new guest - Guest: %s", guest_name)
+    notification = NotificationService.notify_all_users(
+        title="New Guest Added",
+        message=f"Guest {guest_name} has been added to the system for {guest_data['number_of_days']} days",
+        notification_type='guest_added',
+        related_entity_type='tenant',
+        related_entity_id=tenant_id,
+        priority='normal',
+        data=guest_data
+    )
+    if notification:
+        current_app.logger.debug("Guest creation notification created with ID: %s", notification.id)
+    else:
+        current_app.logger.warning("Failed to create guest creation notification")
+    
+    # Create additional notification for kitchen staff if guest has meal plans
+    if not meal_data:
+        current_app.logger.debug("No meal plans found, skipping meal plan notification")
+        return
+    
+    meal_info = []
+    if meal_data['breakfast_days'] > 0:
+        meal_info.append(f"{meal_data['breakfast_days']} breakfast days")
+    if meal_data['dinner_days'] > 0:
+        meal_info.append(f"{meal_data['dinner_days']} dinner days")
+    
+    current_app.logger.debug("Creating meal plan notification - Guest: %s, Meal info: %s",
+                             guest_name, meal_info)
+    meal_notification = NotificationService.notify_all_users(
+        title="New Guest with Meal Plan",
+        message=f"Guest {guest_name} has meal plan: {', '.join(meal_info)}. Number of guests: {meal_data['number_of_guests']}",
+        notification_type='meal_plan',
+        related_entity_type='tenant',
+        related_entity_id=tenant_id,
+        priority='high',
+        data=meal_data
+    )
+    if meal_notification:
+        current_app.logger.debug("Meal plan notification created with ID: %s", meal_notification.id)
+    else:
+        current_app.logger.warning("Failed to create meal plan notification")
+
 @guests_bp.route('/<int:tenant_id>/view')
 @login_required
 def view(tenant_id):
     """View guest details"""
-    tenant = Tenant.query.get_or_404(tenant_id)
-    print(f"DEBUG: View function - tenant {tenant_id} end_date: {tenant.end_date}")
+    tenant = db.get_or_404(Tenant, tenant_id)
+    current_app.logger.debug("View function - tenant %s end_date: %s", tenant_id, tenant.end_date)
     
     # Get tenant services
     tenant_services = TenantService.query.filter_by(tenant_id=tenant.id).all()
@@ -462,23 +638,18 @@ def view(tenant_id):
     # Get payments
     payments = Payment.query.filter_by(tenant_id=tenant.id).order_by(Payment.payment_date.desc()).all()
     
-    # Use the new calculation method for consistent balance calculation
-    balance_info = calculate_guest_balance(tenant)
+    # Use the new calculation method for consistent balance calculation,
+    # reusing the rows loaded above instead of re-querying them
+    balance_info = calculate_guest_balance(
+        tenant,
+        total_paid=sum(p.amount for p in payments),
+        extra_services=sum(ts.quantity * ts.unit_price for ts in tenant_services)
+    )
     
     # Calculate additional totals for display
-    total_services = balance_info['extra_services']
-    total_payments = balance_info['total_paid']
     total_deposit = sum(p.amount for p in payments if p.payment_type == 'deposit')
     total_rent = sum(p.amount for p in payments if p.payment_type == 'rent')
     
-    # Use calculated values
-    room_charges = balance_info['room_charges']
-    extra_services_total = balance_info['extra_services']
-    total_amount = balance_info['total_due']
-    balance = balance_info['balance']
-    paid_amount = balance_info['total_paid']
-    grand_total = balance_info['total_due']  # grand_total is the same as total_due
-    
     # Calculate duration for display
     if tenant.end_date:
         duration_days = (tenant.end_date - tenant.start_date).days
@@ -491,85 +662,58 @@ def view(tenant_id):
                          tenant=tenant,
                          tenant_services=tenant_services,
                          payments=payments,
-                         total_services=total_services,
-                         total_payments=total_payments,
+                         total_services=balance_info['extra_services'],
+                         total_payments=balance_info['total_paid'],
                          total_deposit=total_deposit,
                          total_rent=total_rent,
-                         grand_total=grand_total,
-                         balance=balance,
+                         grand_total=balance_info['total_due'],
+                         balance=balance_info['balance'],
                          duration_days=duration_days,
-                         extra_services_total=extra_services_total,
-                         total_amount=total_amount,
-                         paid_amount=paid_amount)
+                         extra_services_total=balance_info['extra_services'],
+                         total_amount=balance_info['total_due'],
+                         paid_amount=balance_info['total_paid'])
 
 @guests_bp.route('/<int:tenant_id>/edit', methods=['GET', 'POST'])
 @login_required
 def edit(tenant_id):
     """Edit guest information"""
-    tenant = Tenant.query.get_or_404(tenant_id)
+    tenant = db.get_or_404(Tenant, tenant_id)
     
     if request.method == 'POST':
-        name = request.form.get('name')
-        daily_rent = request.form.get('daily_rent')
-        bed_id = request.form.get('bed_id')
-        number_of_days = request.form.get('number_of_days')
-        start_date = request.form.get('start_date')
-        number_of_guests = int(request.form.get('number_of_guests', 1))
-        multiply_rent_by_guests = bool(request.form.get('multiply_rent_by_guests'))
-
-        is_prepaid = bool(request.form.get('is_prepaid'))
-        
-        # Meal planning fields
-        breakfast_days = int(request.form.get('breakfast_days', 0))
-        dinner_days = int(request.form.get('dinner_days', 0))
-        meal_plan_start = request.form.get('meal_plan_start')
-        meal_plan_end = request.form.get('meal_plan_end')
-        
-        # If prepaid, daily_rent is not required but number_of_days is still required
-        if is_prepaid:
-            if not all([name, start_date, number_of_days]):
-                flash('Please fill in all required fields (Name, Start Date, and Number of Days).', 'error')
-                return render_template('guests/form.html', tenant=tenant)
-        else:
-            if not all([name, daily_rent, start_date, number_of_days]):
-                flash('Please fill in all required fields.', 'error')
-                return render_template('guests/form.html', tenant=tenant)
+        try:
+            data = _parse_guest_form(request.form)
+        except ValueError as e:
+            flash(str(e), 'error')
+            return render_template('guests/form.html', tenant=tenant)
+        bed_id = data['bed_id']
         
         try:
-            # If prepaid, set daily_rent to 0, otherwise convert to float
-            if is_prepaid:
-                daily_rent = 0
-            else:
-                daily_rent = float(daily_rent)
-            number_of_days = int(number_of_days)
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            
             # Update tenant
-            tenant.name = name
-            tenant.daily_rent = 0 if is_prepaid else daily_rent
-            tenant.number_of_guests = number_of_guests
-            tenant.multiply_rent_by_guests = multiply_rent_by_guests
+            tenant.name = data['name']
+            tenant.daily_rent = data['daily_rent']
+            tenant.number_of_guests = data['number_of_guests']
+            tenant.multiply_rent_by_guests = data['multiply_rent_by_guests']
 
-            tenant.is_prepaid = is_prepaid
-            tenant.start_date = start_date
-            tenant.end_date = start_date + timedelta(days=number_of_days)
-            tenant.breakfast_days = breakfast_days
-            tenant.dinner_days = dinner_days
-            tenant.meal_plan_start = meal_plan_start
-            tenant.meal_plan_end = meal_plan_end
+            tenant.is_prepaid = data['is_prepaid']
+            tenant.start_date = data['start_date']
+            tenant.end_date = data['end_date']
+            tenant.breakfast_days = data['breakfast_days']
+            tenant.dinner_days = data['dinner_days']
+            tenant.meal_plan_start = data['meal_plan_start']
+            tenant.meal_plan_end = data['meal_plan_end']
             
             # Handle bed assignment
             if bed_id:
                 # Free current bed if any
                 if tenant.bed_id:
-                    current_bed = Bed.query.get(tenant.bed_id)
+                    current_bed = db.session.get(Bed, tenant.bed_id)
                     if current_bed:
                         current_bed.tenant_id = None
                         current_bed.is_occupied = False
                         current_bed.status = 'clean'
                 
                 # Assign new bed
-                new_bed = Bed.query.get(bed_id)
+                new_bed = db.session.get(Bed, bed_id)
                 if new_bed and not new_bed.is_occupied:
                     tenant.bed_id = bed_id
                     new_bed.tenant_id = tenant.id
@@ -582,68 +726,31 @@ def edit(tenant_id):
             
             # Update meal plan services if specified
             # First, remove existing meal services
-            TenantService.query.filter_by(tenant_id=tenant.id).filter(
-                or_(
-                    TenantService.service_id == Service.query.filter_by(name='Breakfast').first().id,
-                    TenantService.service_id == Service.query.filter_by(name='Dinner').first().id
-                )
-            ).delete()
-            
-            # Parse meal plan dates if provided
-            meal_plan_start_date = None
-            meal_plan_end_date = None
-            if meal_plan_start:
-                try:
-                    meal_plan_start_date = datetime.strptime(meal_plan_start, '%Y-%m-%d').date()
-                except ValueError:
-                    pass
-            if meal_plan_end:
-                try:
-                    meal_plan_end_date = datetime.strptime(meal_plan_end, '%Y-%m-%d').date()
-                except ValueError:
-                    pass
+            breakfast_service = _service_info('Breakfast')
+            dinner_service = _service_info('Dinner')
+            meal_service_ids = [info[0] for info in (breakfast_service, dinner_service) if info]
+            if meal_service_ids:
+                TenantService.query.filter(
+                    TenantService.tenant_id == tenant.id,
+                    TenantService.service_id.in_(meal_service_ids)
+                ).delete(synchronize_session=False)
             
             # Create new meal services if specified
-            if breakfast_days > 0:
-                breakfast_service = Service.query.filter_by(name='Breakfast').first()
-                if breakfast_service:
-                    # Always multiply breakfast quantity by number of guests
-                    meal_quantity = breakfast_days * number_of_guests
-                    tenant_service = TenantService(
-                        tenant_id=tenant.id,
-                        service_id=breakfast_service.id,
-                        quantity=meal_quantity,
-                        unit_price=breakfast_service.price,
-                        start_date=meal_plan_start_date or start_date,
-                        end_date=meal_plan_end_date or (start_date + timedelta(days=number_of_days))
-                    )
-                    db.session.add(tenant_service)
-            
-            if dinner_days > 0:
-                dinner_service = Service.query.filter_by(name='Dinner').first()
-                if dinner_service:
-                    # Multiply quantity by number of guests if multiply_rent_by_guests is True
-                    meal_quantity = dinner_days * number_of_guests if multiply_rent_by_guests else dinner_days
-                    tenant_service = TenantService(
-                        tenant_id=tenant.id,
-                        service_id=dinner_service.id,
-                        quantity=meal_quantity,
-                        unit_price=dinner_service.price,
-                        start_date=meal_plan_start_date or start_date,
-                        end_date=meal_plan_end_date or (start_date + timedelta(days=number_of_days))
-                    )
-                    db.session.add(tenant_service)
+            meal_services = _build_meal_services(tenant.id, data, breakfast_service, dinner_service)
+            if meal_services:
+                db.session.bulk_save_objects(meal_services)
             
+            _publish_guest_event('update', tenant.id)
             db.session.commit()
+            cache_service.delete_memoized(_cached_guest_counts)
+            cache_service.delete_memoized(_available_beds)
             
             # Log action
             log_tenant_action('updated', tenant)
             
-            flash(f'Guest {name} updated successfully!', 'success')
+            flash(f'Guest {tenant.name} updated successfully!', 'success')
             return redirect(url_for('guests.view', tenant_id=tenant.id))
             
-        except ValueError:
-            flash('Please enter valid numbers for daily rent and number of days.', 'error')
         except Exception as e:
             db.session.rollback()
             flash(f'Error updating guest: {str(e)}', 'error')
@@ -652,12 +759,50 @@ def edit(tenant_id):
     return render_template('guests/form.html', 
                          tenant=tenant)
 
+# Tenant columns log_tenant_action() records; load them with _get_tenant_or_404
+# in routes that log, so the audit entry does not lazy-load them one by one
+_AUDIT_COLUMNS = (Tenant.name, Tenant.email, Tenant.phone, Tenant.daily_rent)
+
+def _get_tenant_or_404(tenant_id, *columns):
+    """
+    Load a guest with only the given columns (plus the primary key).
+    
+    For write routes that touch a handful of Tenant attributes; anything
+    else is loaded on first access.
+    """
+    return Tenant.query.options(load_only(Tenant.id, *columns))\
+        .filter_by(id=tenant_id).first_or_404()
+
+@cache_service.memoize(timeout=60)
+def _available_beds():
+    """
+    Clean, unoccupied beds with their room details, as plain dicts.
+    
+    Cached briefly because the check-in form is rendered far more often
+    than beds change; guest writes that occupy or free a bed clear it, and
+    checkin() re-checks the chosen bed before using it.
+    """
+    rows = db.session.query(
+        Bed.id, Bed.bed_number, Room.room_number, Room.room_type
+    ).join(Room, Bed.room_id == Room.id).filter(
+        Bed.is_occupied == False,
+        Bed.status == 'clean'
+    ).all()
+    return [dict(row._mapping) for row in rows]
+
+def _free_bed(bed_id, status):
+    """Release a bed with a single UPDATE instead of loading it first"""
+    Bed.query.filter_by(id=bed_id).update(
+        {Bed.is_occupied: False, Bed.tenant_id: None, Bed.status: status},
+        synchronize_session=False
+    )
+
 @guests_bp.route('/<int:tenant_id>/checkin', methods=['GET', 'POST'])
 @login_required
 @require_frontdesk_or_admin
 def checkin(tenant_id):
     """Check-in existing guest"""
-    tenant = Tenant.query.get_or_404(tenant_id)
+    tenant = db.get_or_404(Tenant, tenant_id)
     
     if request.method == 'POST':
         bed_id = request.form.get('bed_id')
@@ -669,7 +814,8 @@ def checkin(tenant_id):
             return render_template('guests/checkin.html', tenant=tenant)
         
         try:
-            bed = Bed.query.get(bed_id)
+            # The notification below needs the room number too
+            bed = db.session.get(Bed, bed_id, options=[joinedload(Bed.room)])
             if not bed or bed.is_occupied:
                 flash('Selected bed is not available.', 'error')
                 return render_template('guests/checkin.html', tenant=tenant)
@@ -678,8 +824,8 @@ def checkin(tenant_id):
             checkin = CheckInOut(
                 tenant_id=tenant.id,
                 bed_id=bed_id,
-                check_in_date=datetime.strptime(check_in_date, '%Y-%m-%d'),
-                expected_check_out_date=datetime.strptime(expected_check_out, '%Y-%m-%d'),
+                check_in_date=datetime.fromisoformat(check_in_date),
+                expected_check_out_date=datetime.fromisoformat(expected_check_out),
                 status='checked_in',
                 created_by=current_user.id
             )
@@ -692,20 +838,17 @@ def checkin(tenant_id):
             # Update tenant room number
 
             
-            db.session.add(checkin)
-            db.session.commit()
-            
-            # Send notification to all users about guest check-in
-            from notification_service import NotificationService
-            NotificationService.notify_all_users(
+            # Build the notification from loaded state before commit expires it
+            guest_name = tenant.name
+            notification = dict(
                 title="Guest Check-in",
-                message=f"Guest {tenant.name} has checked in to bed {bed.bed_number} in room {bed.room.room_number}",
+                message=f"Guest {guest_name} has checked in to bed {bed.bed_number} in room {bed.room.room_number}",
                 notification_type='guest_checkin',
                 related_entity_type='tenant',
-                related_entity_id=tenant.id,
+                related_entity_id=tenant_id,
                 priority='normal',
                 data={
-                    'guest_name': tenant.name,
+                    'guest_name': guest_name,
                     'bed_number': bed.bed_number,
                     'room_number': bed.room.room_number,
                     'check_in_date': check_in_date,
@@ -714,15 +857,24 @@ def checkin(tenant_id):
                 }
             )
             
-            flash(f'Guest {tenant.name} checked in successfully!', 'success')
-            return redirect(url_for('guests.view', tenant_id=tenant.id))
+            db.session.add(checkin)
+            _publish_guest_event('checkin', tenant_id)
+            db.session.commit()
+            cache_service.delete_memoized(_cached_guest_counts)
+            cache_service.delete_memoized(_available_beds)
             
         except Exception as e:
             db.session.rollback()
             flash(f'Error during check-in: {str(e)}', 'error')
+        else:
+            # Notify all users about guest check-in in the background
+            background_tasks_service.enqueue(NotificationService.notify_all_users, **notification)
+            
+            flash(f'Guest {guest_name} checked in successfully!', 'success')
+            return redirect(url_for('guests.view', tenant_id=tenant_id))
     
     # GET: Show check-in form
-    available_beds = Bed.query.filter_by(is_occupied=False, status='clean').all()
+    available_beds = _available_beds()
     
     return render_template('guests/checkin.html', 
                          tenant=tenant,
@@ -733,11 +885,13 @@ def checkin(tenant_id):
 @require_frontdesk_or_admin
 def checkout(tenant_id):
     """Check-out guest"""
-    tenant = Tenant.query.get_or_404(tenant_id)
+    tenant = _get_tenant_or_404(tenant_id, Tenant.name, Tenant.is_active, Tenant.end_date)
     
     try:
-        # Find active check-in
-        active_checkin = CheckInOut.query.filter_by(
+        # Find active check-in, with the bed and room the notification reports
+        active_checkin = CheckInOut.query.options(
+            joinedload(CheckInOut.bed).joinedload(Bed.room)
+        ).filter_by(
             tenant_id=tenant.id,
             status='checked_in'
         ).first()
@@ -757,46 +911,53 @@ def checkout(tenant_id):
         tenant.is_active = False
         tenant.end_date = datetime.now().date()
         
-        db.session.commit()
-        
-        # Send notification to all users about guest check-out
-        from notification_service import NotificationService
-        NotificationService.notify_all_users(
+        # Build the notification from loaded state before commit expires it
+        guest_name = tenant.name
+        bed = active_checkin.bed if active_checkin else None
+        notification = dict(
             title="Guest Check-out",
-            message=f"Guest {tenant.name} has checked out from bed {active_checkin.bed.bed_number if active_checkin and active_checkin.bed else 'N/A'}",
+            message=f"Guest {guest_name} has checked out from bed {bed.bed_number if bed else 'N/A'}",
             notification_type='guest_checkout',
             related_entity_type='tenant',
-            related_entity_id=tenant.id,
+            related_entity_id=tenant_id,
             priority='normal',
             data={
-                'guest_name': tenant.name,
-                'bed_number': active_checkin.bed.bed_number if active_checkin and active_checkin.bed else 'N/A',
-                'room_number': active_checkin.bed.room.room_number if active_checkin and active_checkin.bed else 'N/A',
+                'guest_name': guest_name,
+                'bed_number': bed.bed_number if bed else 'N/A',
+                'room_number': bed.room.room_number if bed else 'N/A',
                 'check_out_date': datetime.now().strftime('%Y-%m-%d %H:%M'),
                 'checked_out_by': current_user.username
             }
         )
         
-        flash(f'Guest {tenant.name} checked out successfully!', 'success')
-        return redirect(url_for('guests.index'))
+        _publish_guest_event('checkout', tenant_id)
+        db.session.commit()
+        cache_service.delete_memoized(_cached_guest_counts)
         
     except Exception as e:
         db.session.rollback()
         flash(f'Error during check-out: {str(e)}', 'error')
-        return redirect(url_for('guests.view', tenant_id=tenant.id))
+        return redirect(url_for('guests.view', tenant_id=tenant_id))
+    
+    # Notify all users about guest check-out in the background
+    background_tasks_service.enqueue(NotificationService.notify_all_users, **notification)
+    
+    flash(f'Guest {guest_name} checked out successfully!', 'success')
+    return redirect(url_for('guests.index'))
 
 @guests_bp.route('/<int:tenant_id>/payments')
 @login_required
 def payments(tenant_id):
     """View and manage guest payments"""
-    tenant = Tenant.query.get_or_404(tenant_id)
-    payments = Payment.query.filter_by(tenant_id=tenant.id).order_by(Payment.payment_date.desc()).all()
-    
-    # Get tenant services for extra services calculation
-    tenant_services = TenantService.query.filter_by(tenant_id=tenant.id).all()
+    # Load the guest together with their extra services total (a correlated
+    # subquery): the page shows only the total, not the individual services
+    extra_services_total = db.session.query(
+        func.coalesce(func.sum(TenantService.quantity * TenantService.unit_price), 0)
+    ).filter(TenantService.tenant_id == Tenant.id).scalar_subquery()
+    tenant, extra_services_total = db.session.query(Tenant, extra_services_total)\
+        .filter(Tenant.id == tenant_id).first_or_404()
     
-    # Calculate extra services total using same logic as guest view page
-    extra_services_total = sum(ts.quantity * ts.unit_price for ts in tenant_services)
+    payments = Payment.query.filter_by(tenant_id=tenant_id).order_by(Payment.payment_date.desc()).all()
     
     # Get today's date for the payment form
     today = date.today()
@@ -804,7 +965,6 @@ def payments(tenant_id):
     return render_template('guests/payments.html',
                          tenant=tenant,
                          payments=payments,
-                         tenant_services=tenant_services,
                          extra_services_total=extra_services_total,
                          today=today)
 
@@ -812,7 +972,7 @@ def payments(tenant_id):
 @login_required
 def add_payment(tenant_id):
     """Add payment for guest"""
-    tenant = Tenant.query.get_or_404(tenant_id)
+    tenant = _get_tenant_or_404(tenant_id)
     
     amount = request.form.get('amount')
     payment_date = request.form.get('payment_date')
@@ -835,7 +995,7 @@ def add_payment(tenant_id):
             return redirect(url_for('guests.payments', tenant_id=tenant.id))
         
         # Parse and validate date
-        payment_date = datetime.strptime(payment_date, '%Y-%m-%d').date()
+        payment_date = _parse_ymd(payment_date)
         
         # Validate payment type
         valid_payment_types = ['rent', 'deposit', 'service', 'other']
@@ -849,13 +1009,15 @@ def add_payment(tenant_id):
             amount=amount,
             payment_type=payment_type,
             payment_date=payment_date,
-            payment_for_month=payment_date.strftime('%Y-%m'),  # Generate from payment date
+            payment_for_month=_payment_month(payment_date),  # Generate from payment date
             notes=notes,
             created_by=created_by or current_user.id  # Use form value or current user
         )
         
         db.session.add(payment)
+        _publish_guest_event('payment', tenant_id)
         db.session.commit()
+        cache_service.delete_memoized(_cached_guest_counts)
         
         # Log action
         log_payment_action('created', payment)
@@ -868,7 +1030,7 @@ def add_payment(tenant_id):
     except Exception as e:
         db.session.rollback()
         flash(f'Error adding payment: {str(e)}', 'error')
-        print(f"Payment creation error: {e}")  # For debugging
+        current_app.logger.error("Payment creation error: %s", e)
     
     return redirect(url_for('guests.payments', tenant_id=tenant.id))
 
@@ -877,7 +1039,7 @@ def add_payment(tenant_id):
 @require_frontdesk_or_admin
 def deactivate(tenant_id):
     """Deactivate a guest (mark as inactive and free up resources)"""
-    tenant = Tenant.query.get_or_404(tenant_id)
+    tenant = _get_tenant_or_404(tenant_id, *_AUDIT_COLUMNS, Tenant.is_active, Tenant.checkout_date, Tenant.bed_id)
     
     if not tenant.is_active:
         flash('Guest is already inactive.', 'warning')
@@ -888,13 +1050,9 @@ def deactivate(tenant_id):
         tenant.is_active = False
         tenant.checkout_date = datetime.now().date()
         
-        # Free up the assigned bed if any
+        # Free up the assigned bed if any; mark it dirty for cleaning
         if tenant.bed_id:
-            bed = Bed.query.get(tenant.bed_id)
-            if bed:
-                bed.is_occupied = False
-                bed.tenant_id = None
-                bed.status = 'dirty'  # Mark bed as dirty for cleaning
+            _free_bed(tenant.bed_id, 'dirty')
         
         # Update any active check-ins to checked_out status
         active_checkins = CheckInOut.query.filter_by(
@@ -906,39 +1064,34 @@ def deactivate(tenant_id):
             checkin.status = 'checked_out'
             checkin.actual_check_out_date = datetime.now()
         
-        db.session.commit()
-        
-        # Log the action
+        # Log the action and read the name before commit expires the instance
         log_tenant_action('deactivated', tenant)
+        tenant_name = tenant.name
         
-        flash(f'Guest {tenant.name} has been deactivated successfully.', 'success')
+        _publish_guest_event('deactivate', tenant_id)
+        db.session.commit()
+        cache_service.delete_memoized(_cached_guest_counts)
+        
+        flash(f'Guest {tenant_name} has been deactivated successfully.', 'success')
         return redirect(url_for('guests.index'))
         
     except Exception as e:
         db.session.rollback()
         flash(f'Error deactivating guest: {str(e)}', 'error')
-        return redirect(url_for('guests.view', tenant_id=tenant.id))
+        return redirect(url_for('guests.view', tenant_id=tenant_id))
 
 @guests_bp.route('/api/quick-stats')
 @login_required
 def quick_stats():
     """API endpoint for quick dashboard stats"""
     try:
-        total_active = Tenant.query.filter_by(is_active=True).count()
-        total_checked_in = CheckInOut.query.filter_by(status='checked_in').count()
-        # Note: Payment model doesn't have status field, so we'll show total payments instead
-        total_payments = Payment.query.count()
-        
-        # Today's activities
-        today = datetime.now().date()
-        todays_checkins = CheckInOut.query.filter(
-            db.func.date(CheckInOut.check_in_date) == today
-        ).count()
-        
-        todays_checkouts = CheckInOut.query.filter(
-            db.func.date(CheckInOut.expected_check_out_date) == today,
-            CheckInOut.status == 'checked_in'
-        ).count()
+        # Totals and today's activities. ?fresh=1 (sent when a guest event
+        # arrives) drops this process's cached counts: the write may have been
+        # handled by another process, which only cleared its own cache
+        if request.args.get('fresh') == '1':
+            cache_service.delete_memoized(_cached_guest_counts)
+        (_, total_active, total_checked_in, total_payments,
+         todays_checkins, todays_checkouts) = _cached_guest_counts(date.today())
         
         return jsonify({
             'success': True,
@@ -958,72 +1111,63 @@ def quick_stats():
 @require_frontdesk_or_admin
 def delete(tenant_id):
     """Delete a guest and all related data"""
-    tenant = Tenant.query.get_or_404(tenant_id)
+    tenant = _get_tenant_or_404(tenant_id, *_AUDIT_COLUMNS, Tenant.bed_id)
     
     try:
         # Store tenant name for flash message
         tenant_name = tenant.name
         
-        # Delete related records first (due to foreign key constraints)
-        
-        # 1. Delete tenant services (meal plans, extra services)
-        TenantService.query.filter_by(tenant_id=tenant.id).delete()
-        
-        # 2. Delete payments
-        Payment.query.filter_by(tenant_id=tenant.id).delete()
-        
-        # 3. Delete check-in/out records
-        CheckInOut.query.filter_by(tenant_id=tenant.id).delete()
+        # Log the action while the instance is still loaded; the query-level
+        # DELETE below detaches it
+        log_tenant_action('deleted', tenant, f'Guest {tenant_name} deleted from system')
         
-        # 4. Free up assigned bed if any
+        # 1. Free up assigned bed if any
         if tenant.bed_id:
-            bed = Bed.query.get(tenant.bed_id)
-            if bed:
-                bed.is_occupied = False
-                bed.tenant_id = None
-                bed.status = 'clean'
+            _free_bed(tenant.bed_id, 'clean')
         
-        # 5. Delete the tenant
-        db.session.delete(tenant)
+        # 2. Delete the tenant; services (meal plans, extra services), payments
+        # and check-in/out records go with it through ON DELETE CASCADE
+        # (migrations/tenant_cascade_deletes.sql)
+        Tenant.query.filter_by(id=tenant_id).delete()
+        _publish_guest_event('delete', tenant_id)
         db.session.commit()
-        
-        # Log the action
-        log_tenant_action('deleted', tenant, f'Guest {tenant_name} deleted from system')
-        
-        flash(f'Guest {tenant_name} has been permanently deleted from the system.', 'success')
-        return redirect(url_for('guests.index'))
+        cache_service.delete_memoized(_cached_guest_counts)
+        cache_service.delete_memoized(_available_beds)
         
     except Exception as e:
         db.session.rollback()
         flash(f'Error deleting guest: {str(e)}', 'error')
-        return redirect(url_for('guests.view', tenant_id=tenant.id))
+        return redirect(url_for('guests.view', tenant_id=tenant_id))
+    
+    flash(f'Guest {tenant_name} has been permanently deleted from the system.', 'success')
+    return redirect(url_for('guests.index'))
 
 @guests_bp.route('/<int:tenant_id>/test-extend', methods=['POST'])
 @login_required
 def test_extend(tenant_id):
     """Simple test route to see if form submission works"""
-    print(f"TEST: Simple extend route hit for tenant {tenant_id}")
-    print(f"TEST: Form data: {dict(request.form)}")
+    current_app.logger.debug("Simple extend route hit for tenant %s", tenant_id)
+    current_app.logger.debug("Form data: %s", dict(request.form))
     flash('Test route working!', 'success')
-    return redirect(url_for('guests.view', tenant_id=tenant.id))
+    return redirect(url_for('guests.view', tenant_id=tenant_id))
 
 @guests_bp.route('/<int:tenant_id>/extend-stay', methods=['POST'])
 @login_required
 def extend_stay(tenant_id):
     """Extend guest stay by additional days with proper payment handling"""
-    print(f"DEBUG: extend_stay route hit for tenant {tenant_id}")
-    tenant = Tenant.query.get_or_404(tenant_id)
+    current_app.logger.debug("extend_stay route hit for tenant %s", tenant_id)
+    tenant = _get_tenant_or_404(tenant_id, *_AUDIT_COLUMNS, Tenant.start_date, Tenant.end_date, Tenant.is_prepaid)
     
     try:
-        print(f"DEBUG: Form data received: {dict(request.form)}")
+        current_app.logger.debug("Form data received: %s", dict(request.form))
         additional_days = int(request.form.get('additional_days', 0))
         new_daily_rate = float(request.form.get('new_daily_rate', tenant.daily_rent))
         
-        print(f"DEBUG: Extending stay for tenant {tenant_id}")
-        print(f"DEBUG: Additional days: {additional_days}")
-        print(f"DEBUG: New daily rate: {new_daily_rate}")
-        print(f"DEBUG: Current end date: {tenant.end_date}")
-        print(f"DEBUG: Is prepaid: {tenant.is_prepaid}")
+        current_app.logger.debug("Extending stay for tenant %s", tenant_id)
+        current_app.logger.debug("Additional days: %s", additional_days)
+        current_app.logger.debug("New daily rate: %s", new_daily_rate)
+        current_app.logger.debug("Current end date: %s", tenant.end_date)
+        current_app.logger.debug("Is prepaid: %s", tenant.is_prepaid)
         
         if additional_days <= 0:
             flash('Additional days must be greater than 0', 'error')
@@ -1037,116 +1181,106 @@ def extend_stay(tenant_id):
             # Use current checkout date and add extended days
             old_end_date = tenant.end_date
             tenant.end_date = tenant.end_date + timedelta(days=additional_days)
-            print(f"DEBUG: Updated end date (from current checkout): {old_end_date} + {additional_days} days = {tenant.end_date}")
+            current_app.logger.debug("Updated end date (from current checkout): %s + %s days = %s", old_end_date, additional_days, tenant.end_date)
         else:
             # If no end date, calculate from start date + original duration + additional days
             tenant.end_date = tenant.start_date + timedelta(days=additional_days)
-            print(f"DEBUG: Updated end date (from start): {tenant.end_date}")
+            current_app.logger.debug("Updated end date (from start): %s", tenant.end_date)
         
-        print(f"DEBUG: Tenant object end_date after calculation: {tenant.end_date}")
-        print(f"DEBUG: Tenant object type: {type(tenant.end_date)}")
         
         # Calculate payment for additional days ONLY
         additional_cost = additional_days * new_daily_rate
         
-        # Handle payment based on prepaid status
+        # Charge for the additional days only; for prepaid guests the
+        # original prepaid amount is left untouched
         if tenant.is_prepaid:
-            # For prepaid guests: Only charge for additional days, don't touch original prepaid amount
-            print(f"DEBUG: Prepaid guest - charging only for additional days: {additional_cost} MAD")
-            
-            if additional_cost > 0:
-                payment = Payment(
-                    tenant_id=tenant.id,
-                    amount=additional_cost,
-                    payment_date=date.today(),
-                    payment_for_month=date.today().strftime('%Y-%m'),
-                    payment_type='extension',
-                    notes=f'Extension payment for {additional_days} additional days at {new_daily_rate} MAD/day (Prepaid guest)',
-                    created_by=current_user.id
-                )
-                db.session.add(payment)
-                print(f"DEBUG: Created extension payment for prepaid guest: {additional_cost} MAD")
-                
-                # Log the payment
-                log_payment_action('created', payment, f'Extension payment for prepaid guest: {additional_days} days at {new_daily_rate} MAD/day')
+            current_app.logger.debug("Prepaid guest - charging only for additional days: %s MAD", additional_cost)
+            payment_notes = f'Extension payment for {additional_days} additional days at {new_daily_rate} MAD/day (Prepaid guest)'
+            log_details = f'Extension payment for prepaid guest: {additional_days} days at {new_daily_rate} MAD/day'
         else:
-            # For regular guests: Charge for additional days
-            print(f"DEBUG: Regular guest - charging for additional days: {additional_cost} MAD")
+            current_app.logger.debug("Regular guest - charging for additional days: %s MAD", additional_cost)
+            payment_notes = f'Extension payment for {additional_days} additional days at {new_daily_rate} MAD/day'
+            log_details = f'Extension payment: {additional_days} days at {new_daily_rate} MAD/day'
+        
+        if additional_cost > 0:
+            today = date.today()
+            payment = Payment(
+                tenant_id=tenant.id,
+                amount=additional_cost,
+                payment_date=today,
+                payment_for_month=_payment_month(today),
+                payment_type='extension',
+                notes=payment_notes,
+                created_by=current_user.id
+            )
+            db.session.add(payment)
+            current_app.logger.debug("Created extension payment: %s MAD", additional_cost)
             
-            if additional_cost > 0:
-                payment = Payment(
-                    tenant_id=tenant.id,
-                    amount=additional_cost,
-                    payment_date=date.today(),
-                    payment_for_month=date.today().strftime('%Y-%m'),
-                    payment_type='extension',
-                    notes=f'Extension payment for {additional_days} additional days at {new_daily_rate} MAD/day',
-                    created_by=current_user.id
-                )
-                db.session.add(payment)
-                print(f"DEBUG: Created extension payment for regular guest: {additional_cost} MAD")
-                
-                # Log the payment
-                log_payment_action('created', payment, f'Extension payment: {additional_days} days at {new_daily_rate} MAD/day')
+            # Log the payment
+            log_payment_action('created', payment, log_details)
         
         # Update daily rate for future calculations (but don't affect existing prepaid amount)
         if new_daily_rate != tenant.daily_rent:
             tenant.daily_rent = new_daily_rate
-            print(f"DEBUG: Updated daily rate to: {new_daily_rate}")
+            current_app.logger.debug("Updated daily rate to: %s", new_daily_rate)
         
         # Log the action
         log_tenant_action('extended', tenant, f'Stay extended by {additional_days} days. New end date: {tenant.end_date.strftime("%Y-%m-%d")}. Additional cost: {additional_cost:.0f} MAD')
         
-        print(f"DEBUG: About to commit changes")
-        print(f"DEBUG: Final end date before commit: {tenant.end_date}")
-        print(f"DEBUG: Tenant ID: {tenant.id}")
-        print(f"DEBUG: Tenant name: {tenant.name}")
-        print(f"DEBUG: Tenant object before commit: {tenant}")
-        print(f"DEBUG: Tenant end_date type before commit: {type(tenant.end_date)}")
+        # Read before commit expires the instance
+        new_end_date = tenant.end_date
+        is_prepaid = tenant.is_prepaid
+        
+        current_app.logger.debug("About to commit changes - tenant %s, final end date: %s", tenant, new_end_date)
         
         try:
+            _publish_guest_event('extend', tenant_id)
             db.session.commit()
-            print(f"DEBUG: Changes committed successfully")
+            cache_service.delete_memoized(_cached_guest_counts)
+            current_app.logger.debug("Changes committed successfully")
         except Exception as commit_error:
-            print(f"DEBUG: Commit error: {commit_error}")
+            current_app.logger.error("Commit error: %s", commit_error)
             db.session.rollback()
             raise commit_error
         
-        # Verify the changes were actually saved
-        db.session.refresh(tenant)
-        print(f"DEBUG: After commit - tenant.end_date: {tenant.end_date}")
-        print(f"DEBUG: After commit - tenant.daily_rent: {tenant.daily_rent}")
-        
-        # Double-check by querying the database directly
-        fresh_tenant = Tenant.query.get(tenant.id)
-        print(f"DEBUG: Fresh query - tenant.end_date: {fresh_tenant.end_date}")
-        print(f"DEBUG: Fresh query - tenant.daily_rent: {fresh_tenant.daily_rent}")
-        
-        # Check if the dates match
-        if fresh_tenant.end_date == tenant.end_date:
-            print(f"DEBUG: ✅ Database update successful - dates match")
-        else:
-            print(f"DEBUG: ❌ Database update failed - dates don't match")
-            print(f"DEBUG: Expected: {tenant.end_date}, Got: {fresh_tenant.end_date}")
+        # Verify the changes were actually saved (debug mode only: these are
+        # two extra SELECTs)
+        if current_app.debug:
+            db.session.refresh(tenant)
+            current_app.logger.debug("After commit - tenant.end_date: %s", tenant.end_date)
+            current_app.logger.debug("After commit - tenant.daily_rent: %s", tenant.daily_rent)
+            
+            # Double-check by querying the database directly
+            fresh_tenant = db.session.get(Tenant, tenant.id, populate_existing=True)
+            current_app.logger.debug("Fresh query - tenant.end_date: %s", fresh_tenant.end_date)
+            current_app.logger.debug("Fresh query - tenant.daily_rent: %s", fresh_tenant.daily_rent)
+            
+            # Check if the dates match
+            if fresh_tenant.end_date == tenant.end_date:
+                current_app.logger.debug("Database update successful - dates match")
+            else:
+                current_app.logger.warning("Database update failed - dates don't match. Expected: %s, Got: %s",
+                                           tenant.end_date, fresh_tenant.end_date)
         
         # Show appropriate success message
+        new_end_date = new_end_date.strftime("%Y-%m-%d")
         if additional_cost > 0:
-            if fresh_tenant.is_prepaid:
-                flash(f'Stay extended by {additional_days} days. New end date: {fresh_tenant.end_date.strftime("%Y-%m-%d")}. Payment of {additional_cost:.0f} MAD added for additional days (prepaid guest).', 'success')
+            if is_prepaid:
+                flash(f'Stay extended by {additional_days} days. New end date: {new_end_date}. Payment of {additional_cost:.0f} MAD added for additional days (prepaid guest).', 'success')
             else:
-                flash(f'Stay extended by {additional_days} days. New end date: {fresh_tenant.end_date.strftime("%Y-%m-%d")}. Payment of {additional_cost:.0f} MAD added for additional days.', 'success')
+                flash(f'Stay extended by {additional_days} days. New end date: {new_end_date}. Payment of {additional_cost:.0f} MAD added for additional days.', 'success')
         else:
-            flash(f'Stay extended by {additional_days} days. New end date: {fresh_tenant.end_date.strftime("%Y-%m-%d")}', 'success')
+            flash(f'Stay extended by {additional_days} days. New end date: {new_end_date}', 'success')
         
     except ValueError as e:
-        print(f"DEBUG: ValueError: {e}")
+        current_app.logger.debug("ValueError: %s", e)
         flash('Invalid input values. Please check your entries.', 'error')
     except Exception as e:
-        print(f"DEBUG: Exception: {e}")
+        current_app.logger.error("Error extending stay for tenant %s: %s", tenant_id, e)
         db.session.rollback()
         flash(f'Error extending stay: {str(e)}', 'error')
     
-    return redirect(url_for('guests.view', tenant_id=tenant.id))
+    return redirect(url_for('guests.view', tenant_id=tenant_id))
 
 
 # Bulk Actions Routes
@@ -1162,31 +1296,15 @@ def bulk_mark_paid():
         if not guest_ids:
             return jsonify({'success': False, 'message': 'No guests selected'})
         
-        # Update payment status for selected guests
-        updated_count = 0
-        for guest_id in guest_ids:
-            tenant = Tenant.query.get(guest_id)
-            if tenant:
-                tenant.payment_status = 'paid'
-                updated_count += 1
-        
-        db.session.commit()
-        
-        # Log the bulk action
-        log_tenant_action(
-            tenant_id=None,
-            action='bulk_mark_paid',
-            details=f'Marked {updated_count} guests as paid',
-            user_id=current_user.id
-        )
-        
+        # Payment status is derived from recorded payments (see
+        # _guest_balance_columns), so there is no flag to set here; payments
+        # are recorded per guest with their amount and method
         return jsonify({
-            'success': True, 
-            'message': f'Successfully marked {updated_count} guests as paid'
+            'success': False,
+            'message': 'Marking guests as paid in bulk is not supported; record a payment for each guest instead'
         })
         
     except Exception as e:
-        db.session.rollback()
         return jsonify({'success': False, 'message': str(e)})
 
 
@@ -1202,14 +1320,20 @@ def bulk_send_reminder():
         if not guest_ids:
             return jsonify({'success': False, 'message': 'No guests selected'})
         
-        # Send reminders to selected guests
-        sent_count = 0
-        for guest_id in guest_ids:
-            tenant = Tenant.query.get(guest_id)
-            if tenant and tenant.payment_status != 'paid':
-                # Here you would integrate with your email service
-                # For now, we'll just log the action
-                sent_count += 1
+        # Send reminders to selected guests that have not paid, using the same
+        # derived payment status as the guests list
+        paid_sq, services_sq, balance_columns = _guest_balance_columns(date.today())
+        reminder_ids = [row.id for row in db.session.query(Tenant.id).outerjoin(
+            paid_sq, paid_sq.c.tenant_id == Tenant.id
+        ).outerjoin(
+            services_sq, services_sq.c.tenant_id == Tenant.id
+        ).filter(
+            Tenant.id.in_(guest_ids),
+            balance_columns['payment_status'] != 'paid'
+        )]
+        # Here you would integrate with your email service
+        # For now, we'll just log the action
+        sent_count = len(reminder_ids)
         
         # Log the bulk action
         log_tenant_action(
@@ -1240,24 +1364,44 @@ def bulk_checkout():
         if not guest_ids:
             return jsonify({'success': False, 'message': 'No guests selected'})
         
-        # Checkout selected guests
-        checked_out_count = 0
-        for guest_id in guest_ids:
-            tenant = Tenant.query.get(guest_id)
-            if tenant and tenant.status == 'active':
-                tenant.status = 'checked_out'
-                tenant.end_date = date.today()
-                checked_out_count += 1
-                
-                # Log individual checkout
-                log_tenant_action(
-                    tenant_id=tenant.id,
-                    action='checkout',
-                    details='Bulk checkout',
-                    user_id=current_user.id
-                )
+        # Checkout selected guests as checkout() does, with one UPDATE per table:
+        # close their stays, free their beds and mark them inactive
+        checkout_ids = [row.id for row in db.session.query(Tenant.id).filter(
+            Tenant.id.in_(guest_ids),
+            Tenant.is_active == True
+        )]
+        checked_out_count = len(checkout_ids)
+        if checkout_ids:
+            CheckInOut.query.filter(
+                CheckInOut.tenant_id.in_(checkout_ids),
+                CheckInOut.status == 'checked_in'
+            ).update(
+                {CheckInOut.status: 'checked_out', CheckInOut.actual_check_out_date: datetime.now()},
+                synchronize_session=False
+            )
+            Bed.query.filter(Bed.tenant_id.in_(checkout_ids)).update(
+                {Bed.is_occupied: False, Bed.tenant_id: None, Bed.status: 'dirty'},
+                synchronize_session=False
+            )
+            Tenant.query.filter(Tenant.id.in_(checkout_ids)).update(
+                {Tenant.is_active: False, Tenant.end_date: date.today()},
+                synchronize_session=False
+            )
         
+        # Log individual checkouts
+        for tenant_id in checkout_ids:
+            log_tenant_action(
+                tenant_id=tenant_id,
+                action='checkout',
+                details='Bulk checkout',
+                user_id=current_user.id
+            )
+        
+        if checkout_ids:
+            _publish_guest_event('bulk_checkout', count=checked_out_count)
         db.session.commit()
+        cache_service.delete_memoized(_cached_guest_counts)
+        cache_service.delete_memoized(_available_beds)
         
         return jsonify({
             'success': True, 
@@ -1282,22 +1426,32 @@ def bulk_delete():
             return jsonify({'success': False, 'message': 'No guests selected'})
         
         # Delete selected guests
-        deleted_count = 0
-        for guest_id in guest_ids:
-            tenant = Tenant.query.get(guest_id)
-            if tenant:
-                # Log before deletion
-                log_tenant_action(
-                    tenant_id=tenant.id,
-                    action='delete',
-                    details='Bulk delete',
-                    user_id=current_user.id
-                )
-                
-                db.session.delete(tenant)
-                deleted_count += 1
+        delete_ids = [row.id for row in db.session.query(Tenant.id).filter(Tenant.id.in_(guest_ids))]
+        deleted_count = len(delete_ids)
+        
+        # Log before deletion
+        for tenant_id in delete_ids:
+            log_tenant_action(
+                tenant_id=tenant_id,
+                action='delete',
+                details='Bulk delete',
+                user_id=current_user.id
+            )
+        
+        if delete_ids:
+            # Free up assigned beds
+            Bed.query.filter(Bed.tenant_id.in_(delete_ids)).update(
+                {Bed.is_occupied: False, Bed.tenant_id: None, Bed.status: 'clean'},
+                synchronize_session=False
+            )
+            
+            # Related records are removed by ON DELETE CASCADE, as in delete()
+            Tenant.query.filter(Tenant.id.in_(delete_ids)).delete(synchronize_session=False)
+            _publish_guest_event('bulk_delete', count=deleted_count)
         
         db.session.commit()
+        cache_service.delete_memoized(_cached_guest_counts)
+        cache_service.delete_memoized(_available_beds)
         
         return jsonify({
             'success': True, 
@@ -1321,33 +1475,61 @@ def bulk_export():
         if not guest_ids:
             return jsonify({'success': False, 'message': 'No guests selected'})
         
-        # Get guest data
-        guests = Tenant.query.filter(Tenant.id.in_(guest_ids)).all()
-        
-        # Generate CSV data
-        csv_data = []
-        csv_data.append(['ID', 'Name', 'Email', 'Phone', 'Check-in Date', 'Check-out Date', 'Total Amount', 'Payment Status'])
-        
-        for guest in guests:
-            csv_data.append([
-                guest.id,
-                guest.name,
-                guest.email or '',
-                guest.phone or '',
-                guest.start_date.strftime('%Y-%m-%d') if guest.start_date else '',
-                guest.end_date.strftime('%Y-%m-%d') if guest.end_date else '',
-                guest.total_amount or 0,
-                guest.payment_status or ''
-            ])
-        
-        # Convert to CSV string
-        csv_string = '\n'.join([','.join([str(cell) for cell in row]) for row in csv_data])
-        
-        return jsonify({
-            'success': True,
-            'csv_data': csv_string,
-            'filename': f'guests_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-        })
+        # Only the exported columns, as plain rows rather than ORM objects; total
+        # and payment status are derived in SQL as in the guests list
+        paid_sq, services_sq, balance_columns = _guest_balance_columns(date.today())
+        query = db.session.query(
+            Tenant.id,
+            Tenant.name,
+            Tenant.email,
+            Tenant.phone,
+            Tenant.start_date,
+            Tenant.end_date,
+            _calculated_total(balance_columns).label('total_amount'),
+            balance_columns['payment_status'].label('payment_status')
+        ).select_from(Tenant).outerjoin(
+            paid_sq, paid_sq.c.tenant_id == Tenant.id
+        ).outerjoin(
+            services_sq, services_sq.c.tenant_id == Tenant.id
+        ).filter(Tenant.id.in_(guest_ids)).order_by(Tenant.id)
+        # Execute now, so a failing query is reported as an error instead of
+        # ending a streamed 200 response early
+        guests = iter(query.yield_per(1000))
+        
+        def generate():
+            # csv.writer handles quoting; the buffer is flushed after every row
+            # so neither the rows nor the whole file are held in memory
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            
+            def flush():
+                chunk = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                return chunk
+            
+            writer.writerow(EXPORT_HEADER)
+            yield flush()
+            
+            for guest in guests:
+                writer.writerow([
+                    guest.id,
+                    guest.name,
+                    guest.email or '',
+                    guest.phone or '',
+                    guest.start_date.strftime('%Y-%m-%d') if guest.start_date else '',
+                    guest.end_date.strftime('%Y-%m-%d') if guest.end_date else '',
+                    guest.total_amount or 0,
+                    guest.payment_status or ''
+                ])
+                yield flush()
+        
+        filename = f'guests_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
@@ -1,84 +1,205 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, make_response
 from flask_login import login_required, current_user
 from models import InventoryItem, InventoryTransaction, INVENTORY_CATEGORIES, Bed, Tenant
 from extensions import db
-from datetime import datetime
+from services.cache_service import cache_service
+from http_cache import data_version, page_etag, not_modified, with_etag
+from datetime import date
+from sqlalchemy import func, case, update, insert
+from sqlalchemy.orm import joinedload, contains_eager, load_only
 
 inventory_bp = Blueprint('inventory', __name__, url_prefix='/inventory')
 
+def _transaction_stats():
+    """Transaction summary statistics in one pass over inventory_transaction"""
+    def count_type(transaction_type):
+        return func.coalesce(func.sum(case(
+            (InventoryTransaction.transaction_type == transaction_type, 1), else_=0
+        )), 0)
+    
+    return db.session.query(
+        func.count(InventoryTransaction.id).label('total_transactions'),
+        func.sum(InventoryTransaction.total_cost).label('total_value'),
+        count_type('purchase').label('purchases'),
+        count_type('consumption').label('consumptions'),
+        count_type('adjustment').label('adjustments')
+    ).first()
+
+def _item_stock_stats():
+    """Item counts by stock level, evaluated in the database"""
+    return db.session.query(
+        func.count(InventoryItem.id).label('total_items'),
+        func.count(InventoryItem.id).filter(
+            InventoryItem.current_stock <= InventoryItem.minimum_stock
+        ).label('low_stock'),
+        func.count(InventoryItem.id).filter(
+            InventoryItem.current_stock == 0
+        ).label('out_of_stock'),
+        func.coalesce(func.sum(
+            InventoryItem.current_stock * InventoryItem.cost_per_unit
+        ), 0).label('total_value')
+    ).one()
+
+class _UncountedPage:
+    """
+    Page of results fetched without a COUNT(*), exposing the parts of
+    Flask-SQLAlchemy's Pagination the templates use. total is None; whether
+    there is a next page is found by fetching one row past the page.
+    """
+    
+    def __init__(self, query, page, per_page):
+        self.page = max(page, 1)
+        self.per_page = per_page
+        self.total = None
+        rows = query.limit(per_page + 1).offset((self.page - 1) * per_page).all()
+        self.has_next = len(rows) > per_page
+        self.items = rows[:per_page]
+        self.has_prev = self.page > 1
+        self.prev_num = self.page - 1 if self.has_prev else None
+        self.next_num = self.page + 1 if self.has_next else None
+        # Only the pages known to exist: up to the current one, plus the next
+        self.pages = self.next_num or self.page
+    
+    def iter_pages(self, left_edge=2, left_current=2):
+        """Page numbers around the current page, None marking a gap"""
+        start = max(self.page - left_current, 1)
+        if start > left_edge + 1:
+            yield from range(1, left_edge + 1)
+            yield None
+        else:
+            start = 1
+        yield from range(start, self.pages + 1)
+
+TRANSACTION_TYPES = ('purchase', 'consumption', 'adjustment')
+
+def _parse_item_form(form, include_stock=True):
+    """
+    Read and convert the add/edit item form in a single pass.
+    
+    Raises ValueError with a message suitable for flashing when a required
+    field is missing or a number cannot be parsed. current_stock is only
+    read on add; edits go through transactions.
+    """
+    data = {
+        'name': form.get('name'),
+        'category': form.get('category'),
+        'unit': form.get('unit'),
+        'supplier': form.get('supplier'),
+    }
+    if not all([data['name'], data['category'], data['unit']]):
+        raise ValueError('Please fill in all required fields.')
+    
+    try:
+        data['minimum_stock'] = int(form.get('minimum_stock') or 0)
+        data['cost_per_unit'] = float(form.get('cost_per_unit') or 0)
+        if include_stock:
+            data['current_stock'] = int(form.get('current_stock') or 0)
+    except ValueError:
+        raise ValueError('Invalid number format.')
+    return data
+
+def _parse_transaction(data):
+    """
+    Read and convert one transaction from a form or a JSON object.
+    
+    Returns the InventoryTransaction column values other than item_id,
+    running_stock and created_by. Raises ValueError with a message
+    suitable for flashing on missing or malformed fields.
+    """
+    transaction_type = data.get('transaction_type')
+    if not all([transaction_type, data.get('quantity'), data.get('date')]):
+        raise ValueError('Please fill in all required fields.')
+    if transaction_type not in TRANSACTION_TYPES:
+        raise ValueError('Invalid transaction type.')
+    
+    try:
+        quantity = int(data.get('quantity'))
+        cost_per_unit = float(data.get('cost_per_unit') or 0)
+        transaction_date = date.fromisoformat(data.get('date'))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid number or date format.')
+    
+    total_cost = quantity * cost_per_unit if cost_per_unit > 0 else 0
+    return {
+        'transaction_type': transaction_type,
+        'quantity': quantity,
+        'cost_per_unit': cost_per_unit if cost_per_unit > 0 else None,
+        'total_cost': total_cost if total_cost > 0 else None,
+        'date': transaction_date,
+        'notes': data.get('notes'),
+    }
+
+@cache_service.memoize(timeout=300)
+def _inventory_categories():
+    """Distinct categories in use, for the transaction filter"""
+    return [row.category for row in db.session.query(InventoryItem.category).distinct()]
+
 @inventory_bp.route('/')
 @login_required
 def index():
-    items = InventoryItem.query.order_by(InventoryItem.name).all()
+    # Repeat visits with nothing changed get a 304 before any dashboard query runs
+    etag = page_etag(data_version('inventory_item', 'inventory_transaction', 'bed'))
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
     
-    # Mark items with low stock
-    for item in items:
-        item.is_low_stock = item.current_stock <= item.minimum_stock
+    page = request.args.get('page', 1, type=int)
+    # Only the columns the items table renders
+    pagination = InventoryItem.query.options(load_only(
+        InventoryItem.name,
+        InventoryItem.category,
+        InventoryItem.unit,
+        InventoryItem.current_stock,
+        InventoryItem.minimum_stock,
+        InventoryItem.cost_per_unit,
+        InventoryItem.supplier
+    )).order_by(InventoryItem.name).paginate(
+        page=page, per_page=50, error_out=False
+    )
+    items = pagination.items
+    item_stats = _item_stock_stats()
     
     # Get recent inventory transactions for global history
-    recent_transactions = InventoryTransaction.query.order_by(
+    recent_transactions = InventoryTransaction.query.options(
+        joinedload(InventoryTransaction.item)
+    ).order_by(
         InventoryTransaction.created_at.desc()
     ).limit(50).all()
     
     # Get transaction summary statistics
-    from sqlalchemy import func
-    transaction_stats = db.session.query(
-        func.count(InventoryTransaction.id).label('total_transactions'),
-        func.sum(InventoryTransaction.total_cost).label('total_value'),
-        func.count(InventoryTransaction.id).filter(InventoryTransaction.transaction_type == 'purchase').label('purchases'),
-        func.count(InventoryTransaction.id).filter(InventoryTransaction.transaction_type == 'consumption').label('consumptions'),
-        func.count(InventoryTransaction.id).filter(InventoryTransaction.transaction_type == 'adjustment').label('adjustments')
-    ).first()
+    transaction_stats = _transaction_stats()
     
     # Beds occupancy snapshot
-    beds = Bed.query.all()
-    occupied_beds = sum(1 for b in beds if b.is_occupied)
-    available_beds = len(beds) - occupied_beds
+    total_beds, occupied_beds = db.session.query(
+        func.count(Bed.id),
+        func.count(Bed.id).filter(Bed.is_occupied.is_(True))
+    ).one()
+    available_beds = total_beds - occupied_beds
     
-    return render_template('inventory/index.html', 
+    return with_etag(make_response(render_template('inventory/index.html', 
                          items=items, 
+                         pagination=pagination,
+                         item_stats=item_stats,
+                         categories=INVENTORY_CATEGORIES,
                          occupied_beds=occupied_beds,
                          available_beds=available_beds,
                          recent_transactions=recent_transactions,
-                         transaction_stats=transaction_stats)
+                         transaction_stats=transaction_stats)), etag)
 
 @inventory_bp.route('/add', methods=['GET', 'POST'])
 @login_required
 def add():
     if request.method == 'POST':
-        name = request.form.get('name')
-        category = request.form.get('category')
-        unit = request.form.get('unit')
-        current_stock = request.form.get('current_stock', 0)
-        minimum_stock = request.form.get('minimum_stock', 0)
-        cost_per_unit = request.form.get('cost_per_unit', 0)
-        supplier = request.form.get('supplier')
-        
-        if not all([name, category, unit]):
-            flash('Please fill in all required fields.', 'error')
-            return render_template('inventory/form.html', categories=INVENTORY_CATEGORIES)
-        
         try:
-            current_stock = int(current_stock)
-            minimum_stock = int(minimum_stock)
-            cost_per_unit = float(cost_per_unit)
-        except ValueError:
-            flash('Invalid number format.', 'error')
+            item = InventoryItem(**_parse_item_form(request.form))
+        except ValueError as e:
+            flash(str(e), 'error')
             return render_template('inventory/form.html', categories=INVENTORY_CATEGORIES)
         
-        item = InventoryItem(
-            name=name,
-            category=category,
-            unit=unit,
-            current_stock=current_stock,
-            minimum_stock=minimum_stock,
-            cost_per_unit=cost_per_unit,
-            supplier=supplier
-        )
-        
         try:
             db.session.add(item)
             db.session.commit()
+            cache_service.delete_memoized(_inventory_categories)
             flash('Inventory item added successfully.', 'success')
             return redirect(url_for('inventory.index'))
         except Exception as e:
@@ -93,15 +214,18 @@ def edit(item_id):
     item = InventoryItem.query.get_or_404(item_id)
     
     if request.method == 'POST':
-        item.name = request.form.get('name')
-        item.category = request.form.get('category')
-        item.unit = request.form.get('unit')
-        item.minimum_stock = int(request.form.get('minimum_stock', 0))
-        item.cost_per_unit = float(request.form.get('cost_per_unit', 0))
-        item.supplier = request.form.get('supplier')
+        try:
+            data = _parse_item_form(request.form, include_stock=False)
+        except ValueError as e:
+            flash(str(e), 'error')
+            return render_template('inventory/form.html', item=item, categories=INVENTORY_CATEGORIES)
+        
+        for field, value in data.items():
+            setattr(item, field, value)
         
         try:
             db.session.commit()
+            cache_service.delete_memoized(_inventory_categories)
             flash('Inventory item updated successfully.', 'success')
             return redirect(url_for('inventory.index'))
         except Exception as e:
@@ -126,67 +250,36 @@ def add_transaction(item_id):
     item = InventoryItem.query.get_or_404(item_id)
     
     if request.method == 'POST':
-        transaction_type = request.form.get('transaction_type')
-        quantity = request.form.get('quantity')
-        cost_per_unit = request.form.get('cost_per_unit', 0)
-        date = request.form.get('date')
-        notes = request.form.get('notes')
-        
-        if not all([transaction_type, quantity, date]):
-            flash('Please fill in all required fields.', 'error')
-            return render_template('inventory/transaction_form.html', item=item)
-        
         try:
-            quantity = int(quantity)
-            cost_per_unit = float(cost_per_unit) if cost_per_unit else 0
-            date = datetime.strptime(date, '%Y-%m-%d').date()
-        except ValueError:
-            flash('Invalid number or date format.', 'error')
+            data = _parse_transaction(request.form)
+        except ValueError as e:
+            flash(str(e), 'error')
             return render_template('inventory/transaction_form.html', item=item)
         
-        total_cost = quantity * cost_per_unit if cost_per_unit > 0 else 0
-        
-        # Calculate running stock after this transaction
-        if transaction_type == 'purchase':
-            running_stock = item.current_stock + quantity
-        elif transaction_type == 'consumption':
-            running_stock = item.current_stock - quantity
-            if running_stock < 0:
-                running_stock = 0
-        else:  # adjustment
-            running_stock = item.current_stock + quantity
-            if running_stock < 0:
-                running_stock = 0
-        
-        transaction = InventoryTransaction(
-            item_id=item_id,
-            transaction_type=transaction_type,
-            quantity=quantity,
-            cost_per_unit=cost_per_unit if cost_per_unit > 0 else None,
-            total_cost=total_cost if total_cost > 0 else None,
-            date=date,
-            notes=notes,
-            running_stock=running_stock,
-            created_by=current_user.id
-        )
-        
-        # Update item stock
-        if transaction_type == 'purchase':
-            item.current_stock += quantity
-            if cost_per_unit > 0:
-                item.cost_per_unit = cost_per_unit
-                item.last_purchased = date
-        elif transaction_type == 'consumption':
-            item.current_stock -= quantity
-            if item.current_stock < 0:
-                item.current_stock = 0
-        elif transaction_type == 'adjustment':
-            # For adjustments, quantity can be positive or negative
-            item.current_stock += quantity
-            if item.current_stock < 0:
-                item.current_stock = 0
+        # Consumption takes stock out; for adjustments quantity can be positive or negative
+        delta = -data['quantity'] if data['transaction_type'] == 'consumption' else data['quantity']
+        values = {'current_stock': func.greatest(InventoryItem.current_stock + delta, 0)}
+        if data['transaction_type'] == 'purchase' and data['cost_per_unit']:
+            values['cost_per_unit'] = data['cost_per_unit']
+            values['last_purchased'] = data['date']
         
         try:
+            # Update the stock in place so concurrent transactions can't overwrite
+            # each other, and take the running stock from the same statement
+            running_stock = db.session.execute(
+                update(InventoryItem)
+                .where(InventoryItem.id == item_id)
+                .values(**values)
+                .returning(InventoryItem.current_stock)
+                .execution_options(synchronize_session=False)
+            ).scalar_one()
+            
+            transaction = InventoryTransaction(
+                item_id=item_id,
+                running_stock=running_stock,
+                created_by=current_user.id,
+                **data
+            )
             db.session.add(transaction)
             db.session.commit()
             flash('Transaction recorded successfully.', 'success')
@@ -197,25 +290,106 @@ def add_transaction(item_id):
     
     return render_template('inventory/transaction_form.html', item=item)
 
+@inventory_bp.route('/transactions/bulk', methods=['POST'])
+@login_required
+def bulk_transactions():
+    """
+    Record many transactions in one go from a JSON array of
+    {item_id, transaction_type, quantity, date, cost_per_unit?, notes?}.
+    Rows are applied in order, exactly as if posted one by one.
+    """
+    data = request.get_json(silent=True)
+    rows = data.get('transactions') if isinstance(data, dict) else data
+    if not rows or not isinstance(rows, list):
+        return jsonify({'success': False, 'message': 'No transactions provided'}), 400
+    
+    transactions = []
+    for index, row in enumerate(rows, start=1):
+        try:
+            if not isinstance(row, dict):
+                raise ValueError('Expected an object.')
+            try:
+                item_id = int(row.get('item_id'))
+            except (TypeError, ValueError):
+                raise ValueError('Invalid item_id.')
+            transactions.append(dict(_parse_transaction(row), item_id=item_id, created_by=current_user.id))
+        except ValueError as e:
+            return jsonify({'success': False, 'message': f'Row {index}: {e}'}), 400
+    
+    try:
+        # Lock the affected items so the stock read here is still current when written back
+        item_ids = {t['item_id'] for t in transactions}
+        stock = dict(db.session.query(InventoryItem.id, InventoryItem.current_stock)
+                     .filter(InventoryItem.id.in_(item_ids))
+                     .with_for_update()
+                     .all())
+        missing = item_ids - stock.keys()
+        if missing:
+            db.session.rollback()
+            return jsonify({'success': False, 'message': f'Unknown inventory items: {sorted(missing)}'}), 404
+        
+        # Running stock per row, net stock per item, and the latest purchase price
+        purchases = {}
+        for t in transactions:
+            delta = -t['quantity'] if t['transaction_type'] == 'consumption' else t['quantity']
+            stock[t['item_id']] = max(stock[t['item_id']] + delta, 0)
+            t['running_stock'] = stock[t['item_id']]
+            if t['transaction_type'] == 'purchase' and t['cost_per_unit']:
+                purchases[t['item_id']] = (t['cost_per_unit'], t['date'])
+        
+        # One executemany INSERT, then one UPDATE covering every item
+        db.session.execute(insert(InventoryTransaction), transactions)
+        values = {'current_stock': case(stock, value=InventoryItem.id)}
+        if purchases:
+            values['cost_per_unit'] = case(
+                {item_id: cost for item_id, (cost, _) in purchases.items()},
+                value=InventoryItem.id, else_=InventoryItem.cost_per_unit
+            )
+            values['last_purchased'] = case(
+                {item_id: purchased for item_id, (_, purchased) in purchases.items()},
+                value=InventoryItem.id, else_=InventoryItem.last_purchased
+            )
+        db.session.execute(
+            update(InventoryItem)
+            .where(InventoryItem.id.in_(stock.keys()))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 500
+    
+    return jsonify({
+        'success': True,
+        'message': f'Recorded {len(transactions)} transactions for {len(stock)} items',
+        'stock': stock
+    })
+
 @inventory_bp.route('/delete/<int:item_id>', methods=['POST'])
 @login_required
 def delete(item_id):
     item = InventoryItem.query.get_or_404(item_id)
     
     try:
-        # Check if there are any related transactions
-        transaction_count = InventoryTransaction.query.filter_by(item_id=item_id).count()
+        # EXISTS stops at the first match, so items without history skip the DELETE
+        transactions = InventoryTransaction.query.filter_by(item_id=item_id)
+        has_transactions = db.session.query(transactions.exists()).scalar()
         
-        if transaction_count > 0:
-            # Delete all related transactions first
-            InventoryTransaction.query.filter_by(item_id=item_id).delete()
-            flash(f'Deleted {transaction_count} related transactions and the inventory item.', 'success')
-        else:
-            flash('Inventory item deleted successfully.', 'success')
+        transaction_count = 0
+        if has_transactions:
+            # Delete all related transactions first; the row count comes back with the DELETE
+            transaction_count = transactions.delete(synchronize_session=False)
         
         # Now delete the item
         db.session.delete(item)
         db.session.commit()
+        cache_service.delete_memoized(_inventory_categories)
+        
+        if transaction_count > 0:
+            flash(f'Deleted {transaction_count} related transactions and the inventory item.', 'success')
+        else:
+            flash('Inventory item deleted successfully.', 'success')
         
     except Exception as e:
         db.session.rollback()
@@ -243,43 +417,38 @@ def global_transactions():
     if transaction_type:
         query = query.filter(InventoryTransaction.transaction_type == transaction_type)
     if category:
-        query = query.join(InventoryItem).filter(InventoryItem.category == category)
+        # Reuse the join for the item the template renders
+        query = query.join(InventoryTransaction.item).filter(InventoryItem.category == category)\
+            .options(contains_eager(InventoryTransaction.item))
+    else:
+        query = query.options(joinedload(InventoryTransaction.item))
     if date_from:
         try:
-            from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
+            from_date = date.fromisoformat(date_from)
             query = query.filter(InventoryTransaction.date >= from_date)
         except ValueError:
             pass
     if date_to:
         try:
-            to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
+            to_date = date.fromisoformat(date_to)
             query = query.filter(InventoryTransaction.date <= to_date)
         except ValueError:
             pass
     
-    # Get paginated results
-    transactions = query.order_by(InventoryTransaction.date.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    # Get paginated results; ?exact_count=0 skips the COUNT(*) over the filtered rows
+    query = query.order_by(InventoryTransaction.date.desc())
+    if request.args.get('exact_count') == '0':
+        transactions = _UncountedPage(query, page, per_page)
+    else:
+        transactions = query.paginate(page=page, per_page=per_page, error_out=False)
     
     # Get summary statistics
-    from sqlalchemy import func
-    stats = db.session.query(
-        func.count(InventoryTransaction.id).label('total_transactions'),
-        func.sum(InventoryTransaction.total_cost).label('total_value'),
-        func.count(InventoryTransaction.id).filter(InventoryTransaction.transaction_type == 'purchase').label('purchases'),
-        func.count(InventoryTransaction.id).filter(InventoryTransaction.transaction_type == 'consumption').label('consumptions'),
-        func.count(InventoryTransaction.id).filter(InventoryTransaction.transaction_type == 'adjustment').label('adjustments')
-    ).first()
-    
-    # Get available categories for filter
-    categories = db.session.query(InventoryItem.category).distinct().all()
-    categories = [cat[0] for cat in categories]
+    stats = _transaction_stats()
     
     return render_template('inventory/global_transactions.html',
                          transactions=transactions,
                          stats=stats,
-                         categories=categories,
+                         categories=_inventory_categories(),
                          filters={
                              'type': transaction_type,
                              'category': category,
@@ -1,20 +1,83 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, copy_current_request_context, make_response
 from flask_login import login_required, current_user
 from extensions import db
-from models import Bed, MaintenanceRequest, User
+from models import Bed, MaintenanceRequest, User, Role, UserRole
 from permissions import require_frontdesk_or_admin
 from audit import log_action
+from services.cache_service import cache_service
+from services.background_tasks_service import background_tasks_service
+from http_cache import data_version, page_etag, not_modified, with_etag
 from datetime import datetime, timedelta
+from sqlalchemy import func, or_, select
 import json
 
 maintenance_bp = Blueprint('maintenance', __name__, url_prefix='/maintenance')
 
 
+def _optional_float(value):
+    """Float from a form value, or None when it is empty or not a number"""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _parse_request_form(form):
+    """
+    Read and convert the new maintenance request form in a single pass.
+    
+    Raises ValueError with a message suitable for flashing when the title
+    or description is missing or a bed/staff id is malformed. An invalid
+    estimated cost is dropped, as before.
+    """
+    data = {
+        'title': form.get('title'),
+        'description': form.get('description'),
+        'priority': form.get('priority', 'normal'),
+        'estimated_cost': _optional_float(form.get('estimated_cost')),
+    }
+    if not all([data['title'], data['description']]):
+        raise ValueError('Title and description are required.')
+    
+    try:
+        for field in ('bed_id', 'assigned_to'):
+            value = form.get(field)
+            data[field] = int(value) if value else None
+    except ValueError:
+        raise ValueError('Invalid bed or staff selection.')
+    return data
+
+
+def _log_action_async(*args, **kwargs):
+    """Write the audit entry off the request path, still attributed to this request's user"""
+    background_tasks_service.enqueue(copy_current_request_context(log_action), *args, **kwargs)
+
+
+@cache_service.memoize(timeout=300)
+def get_maintenance_staff():
+    """Admins and users with the Maintenance role, as plain dicts safe to cache"""
+    staff = db.session.query(User.id, User.username, User.full_name).outerjoin(
+        UserRole, UserRole.user_id == User.id
+    ).outerjoin(
+        Role, Role.id == UserRole.role_id
+    ).filter(
+        or_(User.is_admin.is_(True), Role.name == 'Maintenance')
+    ).distinct().all()
+    return [dict(user._mapping) for user in staff]
+
+
 @maintenance_bp.route('/')
 @login_required
 @require_frontdesk_or_admin
 def index():
     """Maintenance dashboard"""
+    # Requests plus the rooms, beds and assigned users the list renders; repeat
+    # visits with nothing changed get a 304 before any query
+    etag = page_etag(data_version('maintenance_request', 'room', 'bed', 'user'))
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    
     # Filter by status
     status_filter = request.args.get('status', '')
     priority_filter = request.args.get('priority', '')
@@ -27,23 +90,31 @@ def index():
     if priority_filter:
         query = query.filter(MaintenanceRequest.priority == priority_filter)
     
-    requests = query.order_by(
+    page = request.args.get('page', 1, type=int)
+    pagination = query.order_by(
         MaintenanceRequest.priority.desc(),
         MaintenanceRequest.created_at.desc()
-    ).all()
-    
-    # Summary statistics
-    open_requests = MaintenanceRequest.query.filter_by(status='open').count()
-    in_progress_requests = MaintenanceRequest.query.filter_by(status='in_progress').count()
-    urgent_requests = MaintenanceRequest.query.filter_by(priority='urgent', status='open').count()
-    
-    return render_template('maintenance/index.html',
-                         requests=requests,
+    ).paginate(page=page, per_page=50, error_out=False)
+    
+    # Summary statistics, counted over all requests rather than the current page
+    open_requests, in_progress_requests, urgent_requests, completed_requests = db.session.query(
+        func.count(MaintenanceRequest.id).filter(MaintenanceRequest.status == 'open'),
+        func.count(MaintenanceRequest.id).filter(MaintenanceRequest.status == 'in_progress'),
+        func.count(MaintenanceRequest.id).filter(
+            MaintenanceRequest.priority == 'urgent', MaintenanceRequest.status == 'open'
+        ),
+        func.count(MaintenanceRequest.id).filter(MaintenanceRequest.status == 'completed')
+    ).one()
+    
+    return with_etag(make_response(render_template('maintenance/index.html',
+                         requests=pagination.items,
+                         pagination=pagination,
                          open_requests=open_requests,
                          in_progress_requests=in_progress_requests,
                          urgent_requests=urgent_requests,
+                         completed_requests=completed_requests,
                          status_filter=status_filter,
-                         priority_filter=priority_filter)
+                         priority_filter=priority_filter)), etag)
 
 
 @maintenance_bp.route('/add', methods=['GET', 'POST'])
@@ -52,41 +123,22 @@ def index():
 def add():
     """Add new maintenance request"""
     if request.method == 'POST':
-        title = request.form.get('title')
-        description = request.form.get('description')
-        priority = request.form.get('priority', 'normal')
-
-        bed_id = request.form.get('bed_id')
-        assigned_to = request.form.get('assigned_to')
-        estimated_cost = request.form.get('estimated_cost')
-        
-        if not all([title, description]):
-            flash('Title and description are required.', 'error')
-            return render_template('maintenance/form.html')
-        
         try:
-            estimated_cost = float(estimated_cost) if estimated_cost else None
-        except ValueError:
-            estimated_cost = None
+            data = _parse_request_form(request.form)
+        except ValueError as e:
+            flash(str(e), 'error')
+            return render_template('maintenance/form.html',
+                                 maintenance_staff=get_maintenance_staff())
         
-        maintenance_request = MaintenanceRequest(
-            title=title,
-            description=description,
-            priority=priority,
-
-            bed_id=int(bed_id) if bed_id else None,
-            assigned_to=int(assigned_to) if assigned_to else None,
-            estimated_cost=estimated_cost,
-            reported_by=current_user.id
-        )
+        maintenance_request = MaintenanceRequest(reported_by=current_user.id, **data)
         
         try:
             db.session.add(maintenance_request)
             db.session.commit()
             
             # Log the action
-            log_action('maintenance_request_created', 'maintenance_request', maintenance_request.id,
-                      new_values={'title': title, 'priority': priority})
+            _log_action_async('maintenance_request_created', 'maintenance_request', maintenance_request.id,
+                              new_values={'title': data['title'], 'priority': data['priority']})
             
             flash('Maintenance request created successfully.', 'success')
             return redirect(url_for('maintenance.index'))
@@ -94,16 +146,9 @@ def add():
             db.session.rollback()
             flash('Failed to create maintenance request.', 'error')
     
-    # Get staff for form
-    # Get users with maintenance or admin roles
-    maintenance_staff = []
-    for user in User.query.all():
-        if user.is_admin or any(role.name == 'Maintenance' for role in user.roles):
-            maintenance_staff.append(user)
-    
     return render_template('maintenance/form.html', 
  
-                         maintenance_staff=maintenance_staff)
+                         maintenance_staff=get_maintenance_staff())
 
 
 @maintenance_bp.route('/<int:request_id>/update', methods=['POST'])
@@ -127,19 +172,17 @@ def update(request_id):
     if new_status == 'completed':
         maintenance_request.completed_at = datetime.utcnow()
     
-    if actual_cost:
-        try:
-            maintenance_request.actual_cost = float(actual_cost)
-        except ValueError:
-            pass
+    parsed_cost = _optional_float(actual_cost)
+    if parsed_cost is not None:
+        maintenance_request.actual_cost = parsed_cost
     
     try:
         db.session.commit()
         
         # Log the action
-        log_action('maintenance_request_updated', 'maintenance_request', maintenance_request.id,
-                  old_values={'status': old_status},
-                  new_values={'status': new_status, 'actual_cost': actual_cost})
+        _log_action_async('maintenance_request_updated', 'maintenance_request', maintenance_request.id,
+                          old_values={'status': old_status},
+                          new_values={'status': new_status, 'actual_cost': actual_cost})
         
         flash('Maintenance request updated successfully.', 'success')
     except Exception as e:
@@ -170,9 +213,9 @@ def assign(request_id):
             db.session.commit()
             
             # Log the action
-            log_action('maintenance_request_assigned', 'maintenance_request', maintenance_request.id,
-                      old_values={'assigned_to': old_assigned},
-                      new_values={'assigned_to': assigned_to})
+            _log_action_async('maintenance_request_assigned', 'maintenance_request', maintenance_request.id,
+                              old_values={'assigned_to': old_assigned},
+                              new_values={'assigned_to': assigned_to})
             
             flash('Maintenance request assigned successfully.', 'success')
         except Exception as e:
@@ -187,8 +230,9 @@ def assign(request_id):
 @require_frontdesk_or_admin
 def get_beds():
     """Get all beds (API endpoint)"""
-    beds = Bed.query.all()
-    return {
-        'beds': [{'id': bed.id, 'number': bed.bed_number} for bed in beds]
-    }
+    beds = db.session.execute(select(Bed.id, Bed.bed_number)).all()
+    response = jsonify(beds=[{'id': bed_id, 'number': bed_number} for bed_id, bed_number in beds])
+    # Beds rarely change; let the browser reuse the list briefly
+    response.headers['Cache-Control'] = 'private, max-age=60'
+    return response
 
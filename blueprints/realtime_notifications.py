@@ -1,13 +1,22 @@
 from flask import Blueprint, Response, request, jsonify
 from flask_login import login_required, current_user
 from notification_service import NotificationService
+from extensions import db
+from blueprints.guests import GUEST_EVENTS_CHANNEL
+from services.guest_events_service import guest_events_service
 import json
+import queue
 import time
 from threading import Lock
 from collections import defaultdict
 
 realtime_bp = Blueprint('realtime_notifications', __name__, url_prefix='/api/realtime')
 
+# Guest event streams end after this long so they do not pin a worker forever;
+# EventSource reconnects on its own
+GUEST_STREAM_MAX_SECONDS = 300
+GUEST_STREAM_HEARTBEAT_SECONDS = 30
+
 # Store active connections
 active_connections = defaultdict(list)
 connection_lock = Lock()
@@ -81,6 +90,47 @@ def notification_stream():
         'Access-Control-Allow-Headers': 'Cache-Control'
     })
 
+@realtime_bp.route('/guests/stream')
+@login_required
+def guest_event_stream():
+    """Server-Sent Events stream of guest check-in/out and payment events
+    
+    Pushed by PostgreSQL LISTEN/NOTIFY (see guests._publish_guest_event), so
+    dashboards hear about changes as they commit instead of polling
+    /guests/api/quick-stats. All streams in the process share one LISTEN
+    connection (services.guest_events_service); each stream ends after
+    GUEST_STREAM_MAX_SECONDS and the browser reconnects.
+    """
+    dsn = db.engine.url.render_as_string(hide_password=False)
+    
+    def event_stream():
+        events = guest_events_service.subscribe(dsn, GUEST_EVENTS_CHANNEL)
+        if events is None:
+            # Too many open streams in this process: ask the browser to come back later
+            yield "retry: 60000\n\n"
+            return
+        
+        try:
+            yield "retry: 5000\n\n"
+            deadline = time.monotonic() + GUEST_STREAM_MAX_SECONDS
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    payload = events.get(timeout=min(GUEST_STREAM_HEARTBEAT_SECONDS, remaining))
+                except queue.Empty:
+                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': time.time()})}\n\n"
+                    continue
+                yield f"data: {payload}\n\n"
+        finally:
+            guest_events_service.unsubscribe(events)
+    
+    return Response(event_stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'Connection': 'keep-alive'
+    })
+
 @realtime_bp.route('/notifications/push', methods=['POST'])
 @login_required
 def push_notification():
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, make_response, jsonify
+from flask import Blueprint, render_template, request, make_response, jsonify, Response, stream_with_context
 from flask_login import login_required
 from models import Expense, Income, Payment, Tenant, InventoryItem, InventoryTransaction, Stay, TenantService, Service
 from extensions import db
@@ -336,34 +336,40 @@ def inventory_report():
 @login_required
 @require_admin
 def export_inventory():
-    items = InventoryItem.query.order_by(InventoryItem.name).all()
-    
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow(['Name', 'Category', 'Current Stock', 'Unit', 'Minimum Stock', 
-                    'Cost per Unit', 'Total Value', 'Supplier', 'Last Purchased'])
-    
-    # Write data
-    for item in items:
-        total_value = item.current_stock * item.cost_per_unit
-        writer.writerow([
-            item.name,
-            item.category,
-            item.current_stock,
-            item.unit,
-            item.minimum_stock,
-            item.cost_per_unit,
-            total_value,
-            item.supplier or '',
-            item.last_purchased.strftime('%Y-%m-%d') if item.last_purchased else ''
-        ])
-    
-    # Create response
-    response = make_response(output.getvalue())
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = f'attachment; filename=inventory_{datetime.now().strftime("%Y%m%d")}.csv'
-    
-    return response
+    def generate():
+        # Rows are streamed in batches so the whole table is never held in memory
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        def flush():
+            chunk = output.getvalue()
+            output.seek(0)
+            output.truncate()
+            return chunk
+        
+        # Write header
+        writer.writerow(['Name', 'Category', 'Current Stock', 'Unit', 'Minimum Stock', 
+                        'Cost per Unit', 'Total Value', 'Supplier', 'Last Purchased'])
+        yield flush()
+        
+        # Write data
+        for item in InventoryItem.query.order_by(InventoryItem.name).yield_per(500):
+            total_value = item.current_stock * item.cost_per_unit
+            writer.writerow([
+                item.name,
+                item.category,
+                item.current_stock,
+                item.unit,
+                item.minimum_stock,
+                item.cost_per_unit,
+                total_value,
+                item.supplier or '',
+                item.last_purchased.strftime('%Y-%m-%d') if item.last_purchased else ''
+            ])
+            yield flush()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename=inventory_{datetime.now().strftime("%Y%m%d")}.csv'}
+    )
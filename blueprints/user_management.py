@@ -7,6 +7,8 @@ from datetime import datetime
 import json
 from functools import wraps
 from permissions import require_admin
+from services.cache_service import cache_service
+from blueprints.maintenance import get_maintenance_staff
 
 user_management_bp = Blueprint('user_management', __name__, url_prefix='/user-management')
 
@@ -118,6 +120,7 @@ def add_user():
                 print(f"DEBUG: No roles selected")
             
             db.session.commit()
+            cache_service.delete_memoized(get_maintenance_staff)
             print(f"DEBUG: User committed to database successfully")
             flash('User created successfully!', 'success')
             return redirect(url_for('user_management.users_list'))
@@ -173,6 +176,7 @@ def edit_user(user_id):
                     db.session.add(user_role)
             
             db.session.commit()
+            cache_service.delete_memoized(get_maintenance_staff)
             flash('User updated successfully!', 'success')
             return redirect(url_for('user_management.users_list'))
             
@@ -200,6 +204,7 @@ def delete_user(user_id):
         # Delete user
         db.session.delete(user)
         db.session.commit()
+        cache_service.delete_memoized(get_maintenance_staff)
         
         flash('User deleted successfully!', 'success')
     except Exception as e:
@@ -329,6 +334,7 @@ def edit_role(role_id):
                         role.permissions.append(permission)
             
             db.session.commit()
+            cache_service.delete_memoized(get_maintenance_staff)
             flash('Role updated successfully!', 'success')
             return redirect(url_for('user_management.roles_list'))
             
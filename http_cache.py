@@ -0,0 +1,64 @@
+"""
+Conditional GET Helpers
+
+Lets a page answer a repeat request (e.g. an auto-refreshing dashboard)
+with 304 Not Modified before running its queries or rendering, given a
+cheap version string for the data it shows.
+"""
+
+import hashlib
+from flask import request, session, current_app
+from flask_login import current_user
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from extensions import db
+
+
+def data_version(*tables):
+    """
+    Version of the data held in these tables: the last value of each table's
+    <table>_version_seq write counter (migrations/table_versions.sql), read
+    without touching the tables themselves. None when the counters are
+    missing, in which case the page is served without an ETag.
+    """
+    try:
+        row = db.session.execute(text('SELECT ' + ', '.join(
+            f'(SELECT last_value FROM "{table}_version_seq")' for table in tables
+        ))).one()
+    except ProgrammingError:
+        db.session.rollback()
+        current_app.logger.warning("Table version sequences missing; run migrations/table_versions.sql")
+        return None
+    return '.'.join(str(value) for value in row)
+
+
+def page_etag(version):
+    """ETag for the current page: the data version plus the user and the full
+    URL, since menus differ per user and pages/filters per query string.
+    None when there is no data version."""
+    if version is None:
+        return None
+    key = f'{version}:{current_user.get_id()}:{request.full_path}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def not_modified(etag):
+    """
+    Return a 304 response when the client already holds this version of the
+    page, otherwise None. Never short-circuits while flash messages are
+    waiting, as they are only consumed by rendering the page.
+    """
+    if etag is None or '_flashes' in session or not request.if_none_match.contains(etag):
+        return None
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def with_etag(response, etag):
+    """Tag a rendered page and have the browser revalidate it on every visit"""
+    if etag is None:
+        return response
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
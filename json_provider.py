@@ -0,0 +1,41 @@
+"""
+orjson-backed JSON Provider
+
+Serializes jsonify() and dict responses with orjson when it is installed.
+Anything orjson does not handle natively (dates, Decimal, UUID, objects
+with __html__) is passed to Flask's default hook, so the output matches
+the default provider. Without orjson the app keeps Flask's provider.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider whose dumps() goes through orjson"""
+
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('separators', None)  # orjson output is always compact
+        if kwargs or indent not in (None, 2):
+            # Options orjson has no equivalent for
+            return super().dumps(obj, indent=indent, **kwargs)
+
+        # Dates go to the default hook so they keep Flask's HTTP date format
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
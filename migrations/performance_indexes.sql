@@ -0,0 +1,105 @@
+-- HostelFlow Performance Indexes
+-- Indexes backing the hot filters, joins and order-bys used by the blueprints.
+-- Every statement is idempotent, so the script can be re-run safely.
+
+-- =====================================================
+-- Food & Extras (tenant_service)
+-- =====================================================
+
+-- Date range predicate "start_date <= :day AND end_date >= :day" used by
+-- the dashboard, orders, daily summary and quick stats
+CREATE INDEX IF NOT EXISTS idx_tenant_service_date_range ON tenant_service(start_date, end_date);
+
+-- Foreign keys used by guest_services (tenant_id) and view_service / joins (service_id)
+CREATE INDEX IF NOT EXISTS idx_tenant_service_tenant ON tenant_service(tenant_id);
+CREATE INDEX IF NOT EXISTS idx_tenant_service_service ON tenant_service(service_id);
+
+ANALYZE tenant_service;
+
+-- =====================================================
+-- Guest Communications (tenant, guest_communication)
+-- =====================================================
+
+-- Partial indexes for the "has an email / phone" filters used by the
+-- recipient pickers, bulk sends and dashboard contact counts
+CREATE INDEX IF NOT EXISTS idx_tenant_has_email ON tenant(id) WHERE email IS NOT NULL AND email <> '';
+CREATE INDEX IF NOT EXISTS idx_tenant_has_phone ON tenant(id) WHERE phone IS NOT NULL AND phone <> '';
+
+-- Newest-first listings on the dashboard and history pages
+CREATE INDEX IF NOT EXISTS idx_guest_communication_sent_at ON guest_communication(sent_at DESC);
+
+-- Per-type counts on the dashboard
+CREATE INDEX IF NOT EXISTS idx_guest_communication_type ON guest_communication(communication_type);
+
+ANALYZE tenant;
+ANALYZE guest_communication;
+
+-- =====================================================
+-- Guests dashboard (check_in_out)
+-- =====================================================
+
+-- Today's arrivals: check_in_date range scan
+CREATE INDEX IF NOT EXISTS idx_check_in_out_check_in_date ON check_in_out(check_in_date);
+
+-- Today's departures: status = 'checked_in' plus expected_check_out_date range scan
+CREATE INDEX IF NOT EXISTS idx_check_in_out_status_expected_out ON check_in_out(status, expected_check_out_date);
+
+ANALYZE check_in_out;
+
+-- =====================================================
+-- Guests list (tenant, payment)
+-- =====================================================
+
+-- Status filter plus the default name ordering and the check-in ordering,
+-- so the list is read in index order instead of being sorted
+CREATE INDEX IF NOT EXISTS idx_tenant_active_name ON tenant(is_active, name);
+CREATE INDEX IF NOT EXISTS idx_tenant_active_start_date ON tenant(is_active, start_date DESC);
+
+-- Hostel filter; only active guests are listed by default
+CREATE INDEX IF NOT EXISTS idx_tenant_active_hostel ON tenant(hostel_name) WHERE is_active;
+
+-- Per-guest payment totals (balance columns, calculate_guest_balance)
+CREATE INDEX IF NOT EXISTS idx_payment_tenant ON payment(tenant_id);
+
+-- Substring search: name ILIKE '%term%' cannot use a btree index
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_tenant_name_trgm ON tenant USING gin (name gin_trgm_ops);
+
+ANALYZE tenant;
+ANALYZE payment;
+
+-- =====================================================
+-- Guest check-out / deactivate (check_in_out)
+-- =====================================================
+
+-- Active stay lookup: tenant_id = :id AND status = 'checked_in'
+CREATE INDEX IF NOT EXISTS idx_check_in_out_tenant_status ON check_in_out(tenant_id, status);
+
+ANALYZE check_in_out;
+
+-- =====================================================
+-- Inventory transactions
+-- =====================================================
+
+-- Global history: type filter ordered by date
+CREATE INDEX IF NOT EXISTS idx_inventory_transaction_type_date ON inventory_transaction(transaction_type, date DESC);
+
+-- Per-item history and the cascade delete in inventory.delete
+CREATE INDEX IF NOT EXISTS idx_inventory_transaction_item_date ON inventory_transaction(item_id, date DESC);
+
+-- Dashboard: latest 50 transactions
+CREATE INDEX IF NOT EXISTS idx_inventory_transaction_created_at ON inventory_transaction(created_at DESC);
+
+ANALYZE inventory_transaction;
+
+-- =====================================================
+-- Maintenance requests
+-- =====================================================
+
+-- Dashboard: status filter plus the (priority, created_at) ordering
+CREATE INDEX IF NOT EXISTS idx_maintenance_request_status_priority_created ON maintenance_request(status, priority DESC, created_at DESC);
+
+-- Unfiltered dashboard ordering
+CREATE INDEX IF NOT EXISTS idx_maintenance_request_priority_created ON maintenance_request(priority DESC, created_at DESC);
+
+ANALYZE maintenance_request;
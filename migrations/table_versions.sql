@@ -0,0 +1,69 @@
+-- HostelFlow Table Versions
+-- Keeps a write counter per table for the conditional GET (ETag) checks of
+-- the inventory and maintenance dashboards. Each counter is a sequence
+-- named <table>_version_seq: nextval() takes no row lock and is never
+-- rolled back, so concurrent writers do not wait on each other or deadlock,
+-- and every worker process reads the same value. The trigger is deferred to
+-- commit so the new version shows up together with the data, and being on
+-- the table it also catches bulk UPDATE/DELETE statements that bypass the ORM.
+-- Run once before deploying the dashboards that rely on it; the script is
+-- idempotent and can be re-run safely. Without it the dashboards are served
+-- without an ETag.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM nextval(quote_ident(TG_TABLE_NAME || '_version_seq'));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Inventory dashboard: items, transactions and bed occupancy
+-- Maintenance dashboard: requests plus the rooms, beds and assigned users it renders
+CREATE SEQUENCE IF NOT EXISTS inventory_item_version_seq;
+DROP TRIGGER IF EXISTS inventory_item_version ON inventory_item;
+CREATE CONSTRAINT TRIGGER inventory_item_version
+    AFTER INSERT OR UPDATE OR DELETE ON inventory_item
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+
+CREATE SEQUENCE IF NOT EXISTS inventory_transaction_version_seq;
+DROP TRIGGER IF EXISTS inventory_transaction_version ON inventory_transaction;
+CREATE CONSTRAINT TRIGGER inventory_transaction_version
+    AFTER INSERT OR UPDATE OR DELETE ON inventory_transaction
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+
+CREATE SEQUENCE IF NOT EXISTS maintenance_request_version_seq;
+DROP TRIGGER IF EXISTS maintenance_request_version ON maintenance_request;
+CREATE CONSTRAINT TRIGGER maintenance_request_version
+    AFTER INSERT OR UPDATE OR DELETE ON maintenance_request
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+
+CREATE SEQUENCE IF NOT EXISTS room_version_seq;
+DROP TRIGGER IF EXISTS room_version ON room;
+CREATE CONSTRAINT TRIGGER room_version
+    AFTER INSERT OR UPDATE OR DELETE ON room
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+
+CREATE SEQUENCE IF NOT EXISTS bed_version_seq;
+DROP TRIGGER IF EXISTS bed_version ON bed;
+CREATE CONSTRAINT TRIGGER bed_version
+    AFTER INSERT OR UPDATE OR DELETE ON bed
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+
+CREATE SEQUENCE IF NOT EXISTS user_version_seq;
+DROP TRIGGER IF EXISTS user_version ON "user";
+CREATE CONSTRAINT TRIGGER user_version
+    AFTER INSERT OR UPDATE OR DELETE ON "user"
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+
+-- Counters from the earlier, row-locking version of this script
+DROP TABLE IF EXISTS table_version;
+
+COMMIT;
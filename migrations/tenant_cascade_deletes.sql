@@ -0,0 +1,22 @@
+-- HostelFlow Tenant Cascade Deletes
+-- Lets PostgreSQL remove a guest's services, payments and check-in/out
+-- records when the guest row is deleted, so deleting a guest is a single
+-- DELETE FROM tenant instead of one DELETE per child table.
+-- Run once before deploying the guests blueprint that relies on it; the
+-- script is idempotent and can be re-run safely.
+
+BEGIN;
+
+ALTER TABLE tenant_service DROP CONSTRAINT IF EXISTS tenant_service_tenant_id_fkey;
+ALTER TABLE tenant_service ADD CONSTRAINT tenant_service_tenant_id_fkey
+    FOREIGN KEY (tenant_id) REFERENCES tenant(id) ON DELETE CASCADE;
+
+ALTER TABLE payment DROP CONSTRAINT IF EXISTS payment_tenant_id_fkey;
+ALTER TABLE payment ADD CONSTRAINT payment_tenant_id_fkey
+    FOREIGN KEY (tenant_id) REFERENCES tenant(id) ON DELETE CASCADE;
+
+ALTER TABLE check_in_out DROP CONSTRAINT IF EXISTS check_in_out_tenant_id_fkey;
+ALTER TABLE check_in_out ADD CONSTRAINT check_in_out_tenant_id_fkey
+    FOREIGN KEY (tenant_id) REFERENCES tenant(id) ON DELETE CASCADE;
+
+COMMIT;
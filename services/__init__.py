@@ -10,10 +10,14 @@ from .notifications_service import NotificationsService
 from .bulk_actions_service import BulkActionsService
 from .reporting_service import ReportingService
 from .audit_service import AuditService
+from .cache_service import CacheService
+from .background_tasks_service import BackgroundTasksService
 
 __all__ = [
     'NotificationsService',
     'BulkActionsService', 
     'ReportingService',
-    'AuditService'
+    'AuditService',
+    'CacheService',
+    'BackgroundTasksService'
 ]
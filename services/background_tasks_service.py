@@ -0,0 +1,60 @@
+"""
+Centralized Background Tasks Service
+
+Runs fire-and-forget work off the request path including:
+- Notification fan-out after a write has been committed
+- Any other side effect the HTTP response does not need to wait for
+
+Tasks are executed by a daemon worker thread inside a fresh application
+context, so they get their own database session. The queue lives in
+process memory: tasks still pending when the process exits are lost, so
+only enqueue work that is safe to drop (e.g. notifications).
+"""
+
+from typing import Callable, Optional
+from flask import current_app
+import queue
+import threading
+
+
+class BackgroundTasksService:
+    """In-process background task queue"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, func: Callable, *args, **kwargs):
+        """Schedule func(*args, **kwargs) to run in the background worker
+
+        Pass ids and plain values rather than ORM objects: the task runs
+        in its own session and must load what it needs itself.
+        """
+        app = current_app._get_current_object()
+        self._queue.put((app, func, args, kwargs))
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        """Start the worker thread on first use"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='background-tasks')
+                self._worker.daemon = True
+                self._worker.start()
+
+    def _run(self):
+        """Worker loop: execute queued tasks one at a time"""
+        while True:
+            app, func, args, kwargs = self._queue.get()
+            try:
+                with app.app_context():
+                    func(*args, **kwargs)
+            except Exception as e:
+                app.logger.error(f"Background task {getattr(func, '__name__', func)} failed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+
+# Global instance
+background_tasks_service = BackgroundTasksService()
@@ -0,0 +1,92 @@
+"""
+Centralized Cache Service
+
+Provides a small in-process cache shared across all modules including:
+- Key/value storage with per-key expiry
+- Memoization of data-access functions with explicit invalidation
+
+The API mirrors Flask-Caching's ``get`` / ``set`` / ``delete`` /
+``memoize`` / ``delete_memoized`` so the backend can be swapped for Redis later
+without touching call sites.
+"""
+
+from typing import Dict, Optional, Any, Callable, Tuple
+from functools import wraps
+import threading
+import time
+
+
+class CacheService:
+    """Centralized in-process cache service"""
+
+    def __init__(self, default_timeout: int = 300):
+        self.default_timeout = default_timeout
+        self._store: Dict[str, Tuple[float, Any]] = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._store[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None):
+        """Store value under key for timeout seconds"""
+        timeout = self.default_timeout if timeout is None else timeout
+        with self._lock:
+            self._store[key] = (time.monotonic() + timeout, value)
+
+    def delete(self, key: str):
+        """Remove a single key"""
+        with self._lock:
+            self._store.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        """Remove every key starting with prefix"""
+        with self._lock:
+            for key in [k for k in self._store if k.startswith(prefix)]:
+                del self._store[key]
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._store.clear()
+
+    def _memoize_prefix(self, func: Callable) -> str:
+        return f"memoize:{func.__module__}.{func.__qualname__}"
+
+    def _memoize_key(self, func: Callable, args: tuple, kwargs: dict) -> str:
+        return f"{self._memoize_prefix(func)}:{args!r}:{sorted(kwargs.items())!r}"
+
+    def memoize(self, timeout: Optional[int] = None):
+        """Cache a function's return value per argument combination"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = self._memoize_key(func, args, kwargs)
+                value = self.get(key)
+                if value is None:
+                    value = func(*args, **kwargs)
+                    self.set(key, value, timeout)
+                return value
+            wrapper.uncached = func
+            return wrapper
+        return decorator
+
+    def delete_memoized(self, func: Callable, *args, **kwargs):
+        """Invalidate a memoized function, for all arguments unless some are given"""
+        func = getattr(func, 'uncached', func)
+        if args or kwargs:
+            self.delete(self._memoize_key(func, args, kwargs))
+        else:
+            self.delete_prefix(self._memoize_prefix(func))
+
+
+# Global instance
+cache_service = CacheService()
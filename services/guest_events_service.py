@@ -0,0 +1,105 @@
+"""
+Guest Events Service
+
+Fans out PostgreSQL NOTIFY events on the guest events channel to the
+realtime streams served by this process:
+- One listener thread and one LISTEN connection per process, however many
+  dashboards are open
+- A bounded queue per subscribed stream
+- A cap on concurrent subscribers, since every open stream holds a worker
+
+The listener starts with the first subscriber and stops once the last one
+has gone.
+"""
+
+from typing import Optional, Set
+import os
+import queue
+import select
+import threading
+import time
+import psycopg2
+
+
+class GuestEventsService:
+    """Shared LISTEN connection with per-stream subscriber queues"""
+
+    def __init__(self, max_subscribers: int = 20, queue_size: int = 100):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscribers: Set[queue.Queue] = set()
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+
+    def subscribe(self, dsn: str, channel: str) -> Optional[queue.Queue]:
+        """Register a stream and return its queue of payloads, or None when
+        this process already serves max_subscribers streams"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            events = queue.Queue(maxsize=self.queue_size)
+            self._subscribers.add(events)
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(
+                    target=self._listen, args=(dsn, channel), name='guest-events'
+                )
+                self._listener.daemon = True
+                self._listener.start()
+            return events
+
+    def unsubscribe(self, events: queue.Queue):
+        """Remove a stream's queue"""
+        with self._lock:
+            self._subscribers.discard(events)
+
+    def _should_listen(self) -> bool:
+        """False once nobody is subscribed (or another listener took over),
+        so exactly one listener runs while there are subscribers"""
+        with self._lock:
+            if self._listener is not threading.current_thread():
+                return False
+            if not self._subscribers:
+                self._listener = None
+                return False
+            return True
+
+    def _publish(self, payload: str):
+        """Hand a payload to every subscriber without blocking the listener"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait(payload)
+            except queue.Full:
+                # A stalled client only misses events; the next one refreshes it
+                pass
+
+    def _listen(self, dsn: str, channel: str):
+        """Listener loop: reconnects after errors, exits when nobody listens"""
+        while self._should_listen():
+            try:
+                conn = psycopg2.connect(dsn)
+            except psycopg2.Error:
+                time.sleep(5)
+                continue
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {channel}')
+                while self._should_listen():
+                    # Wake up regularly to notice when the last subscriber left
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._publish(conn.notifies.pop(0).payload)
+            except (psycopg2.Error, OSError):
+                time.sleep(1)
+            finally:
+                conn.close()
+
+
+# Global instance
+guest_events_service = GuestEventsService(
+    max_subscribers=int(os.getenv('GUEST_EVENT_STREAMS_MAX', '20'))
+)
@@ -0,0 +1,130 @@
+"""
+Pooled SMTP Connections
+
+Keeps authenticated SMTP connections warm so that a batch of emails pays
+for the TCP connect, STARTTLS handshake and AUTH once instead of once per
+message. Options mirror knadh/smtppool: max_conns, idle_timeout and
+pool_wait_timeout.
+"""
+
+from typing import Optional
+from contextlib import contextmanager
+import os
+import queue
+import smtplib
+import threading
+import time
+
+
+class SMTPPool:
+    """Bounded pool of reusable smtplib.SMTP connections"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        max_conns: int = 4,
+        idle_timeout: int = 60,
+        pool_wait_timeout: int = 10
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_conns = max_conns
+        self.idle_timeout = idle_timeout
+        self.pool_wait_timeout = pool_wait_timeout
+        self._idle = queue.LifoQueue()  # (connection, last_used)
+        self._slots = threading.BoundedSemaphore(max_conns)
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a live, logged-in connection for the duration of the block"""
+        if not self._slots.acquire(timeout=self.pool_wait_timeout):
+            raise TimeoutError("Timed out waiting for a free SMTP connection")
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # The connection is unusable; don't hand it out again
+            self._close(conn)
+            conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put((conn, time.monotonic()))
+            self._slots.release()
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(conn)
+
+    def _checkout(self) -> smtplib.SMTP:
+        """Reuse the most recently returned connection that is still alive"""
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if time.monotonic() - last_used > self.idle_timeout:
+                self._close(conn)
+                continue
+            try:
+                if conn.noop()[0] == 250:
+                    return conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(conn)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        try:
+            server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            # Don't leak the socket of a connection that never became usable
+            server.close()
+            raise
+        return server
+
+    @staticmethod
+    def _close(conn: Optional[smtplib.SMTP]):
+        if conn is None:
+            return
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+
+_pool: Optional[SMTPPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> Optional[SMTPPool]:
+    """Return the shared pool, or None when SMTP credentials are not configured"""
+    global _pool
+    if _pool is None:
+        smtp_username = os.getenv('SMTP_USERNAME')
+        smtp_password = os.getenv('SMTP_PASSWORD')
+        if not all([smtp_username, smtp_password]):
+            return None
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPPool(
+                    host=os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
+                    port=int(os.getenv('SMTP_PORT', '587')),
+                    username=smtp_username,
+                    password=smtp_password,
+                    max_conns=int(os.getenv('SMTP_MAX_CONNS', '4'))
+                )
+    return _pool